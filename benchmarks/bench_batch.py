@@ -0,0 +1,82 @@
+"""Batched vs per-package uninstalls, replayed from recorded transcripts.
+
+    python benchmarks/bench_batch.py [--winget 12] [--appx 12] [--spawn-ms 250]
+
+No winget or PowerShell needed: the batch scripts are answered from the
+recorded per-package outputs below (as captured from winget 1.8 and
+Remove-AppxPackage on Windows 11), with one failure of each kind. Each
+simulated process/host round trip costs --spawn-ms. Checks that the
+combined transcripts are attributed back to the right packages.
+"""
+import os, re, sys, json, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloatguard_batch import BatchExecutor, Removal, by_item, MARK, WINGET_NOT_INSTALLED
+
+WINGET_OK = """Found {name} [{id}]
+Starting package uninstall...
+  ██████████████████████████████  100%
+Successfully uninstalled"""
+WINGET_FAIL = """Found {name} [{id}]
+Starting package uninstall...
+Uninstall failed with exit code: 1603"""
+WINGET_GONE = "No installed package found matching input criteria."
+APPX_FAIL = ("Deployment failed with HRESULT: 0x80073CFA, Removal failed. Please contact your software vendor.\n"
+             "error 0x80070032: AppX Deployment Remove operation on package {id} from: C:\\Program Files\\WindowsApps\\{id} failed.")
+
+def recorded(backend, target, i):
+    """(rc, output) captured for one package; package 3 fails, package 5 is already gone."""
+    if backend == "winget":
+        if i == 3: return 1603, WINGET_FAIL.format(name=target.split(".")[-1], id=target)
+        if i == 5: return WINGET_NOT_INSTALLED, WINGET_GONE
+        return 0, WINGET_OK.format(name=target.split(".")[-1], id=target)
+    if i == 3: return 1, APPX_FAIL.format(id=target)
+    return 0, ""
+
+class Replay:
+    """run_ps stand-in answering batch scripts from the recorded outputs."""
+    def __init__(self, spawn_ms):
+        self.spawn_ms, self.calls = spawn_ms, 0
+    def __call__(self, script, timeout=None):
+        self.calls += 1; time.sleep(self.spawn_ms / 1000)
+        backend = "winget" if "winget uninstall" in script else "appx"
+        targets = re.findall(r"'((?:[^']|'')*)'", script.splitlines()[0])
+        lines = []
+        for i, t in enumerate(targets):
+            rc, out = recorded(backend, t, i)
+            lines += [f"{MARK}begin {i}", out, f"{MARK}end {i} {rc}"]
+        return 0, "\n".join(lines), ""
+
+def per_package(removals, spawn_ms):
+    """Legacy shape: one winget / one PowerShell pipeline per package."""
+    calls, out = 0, []
+    for r in removals:
+        calls += 1; time.sleep(spawn_ms / 1000)
+        idx = [x for x in removals if x.backend == r.backend].index(r)
+        rc, _ = recorded(r.backend, r.target, idx)
+        out.append((r, rc == 0 or (r.backend == "winget" and rc == WINGET_NOT_INSTALLED)))
+    return calls, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--winget", type=int, default=12)
+    ap.add_argument("--appx", type=int, default=12)
+    ap.add_argument("--spawn-ms", type=float, default=250.0)
+    args = ap.parse_args()
+    removals = [Removal(f"w{i % 3}", "winget", f"Vendor.App{i}") for i in range(args.winget)]
+    removals += [Removal(f"a{i % 3}", "appx", f"Vendor.Pack{i}_1.0.0.0_x64__8wekyb3d8bbwe") for i in range(args.appx)]
+
+    t = time.perf_counter(); legacy_calls, legacy = per_package(removals, args.spawn_ms); legacy_s = time.perf_counter() - t
+    replay = Replay(args.spawn_ms)
+    t = time.perf_counter(); batched = BatchExecutor(replay).add(removals).run(); batch_s = time.perf_counter() - t
+
+    agree = [ok for _, ok in legacy] == [ok for _, ok, _ in batched]
+    failed = [r.target for r, ok, _ in batched if not ok]
+    print(json.dumps({"packages": len(removals),
+                      "per_package": {"calls": legacy_calls, "seconds": round(legacy_s, 2)},
+                      "batched": {"calls": replay.calls, "seconds": round(batch_s, 2)},
+                      "failed": failed, "items": {k: v[0] for k, v in sorted(by_item(batched).items())},
+                      "attribution_ok": agree}, indent=2))
+    sys.exit(0 if agree else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Catalogue matching: N per-item scans vs the compiled single pass.
+
+    python benchmarks/bench_catalog.py [--items 300] [--packages 1000] [--runs 5]
+
+Builds a synthetic catalogue (IDs, name regexes and Appx globs) and a fake
+inventory, checks both strategies agree, and reports the median time of each.
+"""
+import os, re, sys, json, time, random, argparse, statistics
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloatguard_catalog import Catalog, CatalogItem, BUILTIN_ITEMS, glob_to_regex
+from bloatguard_inventory import Package
+
+class FakeInventory:
+    def __init__(self, winget, appx):
+        self.winget, self.appx = winget, appx
+        self.winget_gen = self.appx_gen = 1
+    def winget_packages(self): return self.winget
+    def appx_packages(self): return self.appx
+
+def synth(n_items, n_packages, seed=1):
+    rnd = random.Random(seed)
+    vendors = [f"vendor{i}" for i in range(max(1, n_items // 3))]
+    items = [CatalogItem.from_dict(d, builtin=True) for d in BUILTIN_ITEMS]
+    for i in range(n_items):
+        v = rnd.choice(vendors)
+        kind = i % 3
+        if kind == 0: items.append(CatalogItem(f"id{i}", winget_ids=[f"{v}.App{i}"]))
+        elif kind == 1: items.append(CatalogItem(f"name{i}", winget_names=[rf"^{v} tool{i}\b"]))
+        else: items.append(CatalogItem(f"appx{i}", removal="appx", appx=[f"{v}.Pack{i}*"]))
+    winget, appx = [], []
+    for j in range(n_packages):
+        v, i = rnd.choice(vendors), rnd.randrange(n_items)
+        winget.append(Package(f"{v} tool{i} {j}", f"{v}.App{i}" if j % 2 else f"Other.{j}", "1.0", "winget"))
+        appx.append(Package(f"{v}.Pack{i}{j}", f"{v}.Pack{i}{j}_1_x64", source="appx"))
+    return Catalog(items), FakeInventory(winget, appx)
+
+def naive(catalog, inv):
+    """One scan of the inventory per item, as the hand-written detectors did."""
+    out = {}
+    for it in catalog:
+        ids = {x.lower() for x in it.winget_ids}
+        names = [re.compile(p) for p in it.winget_names]
+        globs = [re.compile(glob_to_regex(g.lower())) for g in it.appx]
+        hits = [p for p in inv.winget_packages()
+                if (p.id and p.id.lower() in ids) or any(r.search(p.name.lower()) for r in names)]
+        hits += [p for p in inv.appx_packages() if any(r.match(p.name.lower()) for r in globs)]
+        if hits: out[it.key] = hits
+    return out
+
+def compiled(catalog, inv, fresh=True):
+    cc = catalog.compiled()
+    if fresh: cc._memo.clear()
+    return {it.key: hits for it in catalog if (hits := cc.packages(inv, it.key))}
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter(); res = fn(); samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples), res
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=300)
+    ap.add_argument("--packages", type=int, default=1000)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+    catalog, inv = synth(args.items, args.packages)
+    t = time.perf_counter(); catalog.compiled(); compile_ms = (time.perf_counter() - t) * 1000
+    naive_ms, a = timed(lambda: naive(catalog, inv), args.runs)
+    comp_ms, b = timed(lambda: compiled(catalog, inv), args.runs)
+    memo_ms, _ = timed(lambda: compiled(catalog, inv, fresh=False), args.runs)
+    same = {k: [p.id for p in v] for k, v in a.items()} == {k: [p.id for p in v] for k, v in b.items()}
+    print(json.dumps({"items": args.items, "packages": args.packages * 2, "matched_items": len(b),
+                      "compile_ms": round(compile_ms, 1), "naive_ms": round(naive_ms, 1),
+                      "compiled_ms": round(comp_ms, 1), "memoized_ms": round(memo_ms, 2),
+                      "speedup": round(naive_ms / comp_ms, 1) if comp_ms else None, "same_result": same}, indent=2))
+    sys.exit(0 if same else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Enforce-path benchmark and profiler on a simulated Windows backend.
+
+    python benchmarks/bench_enforce.py [--packages 200] [--latency-scale 0.1] [--fail-rate 0]
+                                       [--profile] [--tracemalloc] [--out result.json]
+                                       [--baseline baseline.json] [--tolerance 0.25]
+
+Runs the real enforce(), agent run_enforcement(), the GUI's detection
+jobs and the schtasks helpers against benchmarks/simwin.py. Per scenario
+it reports wall time, simulated spawns, PowerShell host round trips,
+output bytes parsed, parse time and a per-phase breakdown. With
+--baseline it exits non-zero when spawns grow or parse/wall time regress
+beyond the tolerance.
+"""
+import os, sys, io, json, time, argparse, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["PROGRAMDATA"] = tempfile.mkdtemp(prefix="bg-bench-")  # before bloatguard_core is imported
+
+import bloatguard_inventory
+import bloatguard_core as core
+from simwin import SimWindows, install
+
+ALL_ITEMS = {"edge": True, "store": True, "office": True, "copilot_disable": True, "copilot_remove_webxp": True}
+
+class ParseMeter:
+    """Wraps the inventory parsers to time them and count rows."""
+
+    def __init__(self):
+        self.ms = 0.0; self.calls = 0; self.rows = 0
+        self._orig = (bloatguard_inventory.parse_winget_list, bloatguard_inventory.parse_appx_json)
+        bloatguard_inventory.parse_winget_list = self._wrap(self._orig[0])
+        bloatguard_inventory.parse_appx_json = self._wrap(self._orig[1])
+
+    def _wrap(self, fn):
+        def timed(text):
+            t = time.perf_counter(); rows = fn(text)
+            self.ms += (time.perf_counter() - t) * 1000; self.calls += 1; self.rows += len(rows)
+            return rows
+        return timed
+
+    def reset(self):
+        self.ms = 0.0; self.calls = 0; self.rows = 0
+
+def phases(results):
+    out = {}
+    for name, r in results.items():
+        e = out.setdefault(name.partition(":")[0], {"tasks": 0, "total_ms": 0.0, "max_ms": 0.0})
+        e["tasks"] += 1; e["total_ms"] = round(e["total_ms"] + r.duration_ms, 1); e["max_ms"] = round(max(e["max_ms"], r.duration_ms), 1)
+    return out
+
+def scenario_enforce(sim, force=True):
+    return phases(core.enforce(dict(ALL_ITEMS), force=force))
+
+def scenario_agent(sim):
+    from bloatguard_agent import run_enforcement
+    return phases(run_enforcement(dict(ALL_ITEMS), force=True))
+
+def scenario_detection(sim):
+    """What App.refresh_detection does, minus the widgets: submit every detector, drain per frame."""
+    from bloatguard_gui import DETECT_LABELS
+    from bloatguard_worker import Worker, FRAME_BUDGET_MS
+    worker, started, took = Worker(), {}, {}
+    for key, (_, detect, _, _) in DETECT_LABELS.items():
+        started[key] = time.perf_counter(); worker.submit(key, detect)
+    def on_event(kind, key, payload):
+        took[key] = {"ms": round((time.perf_counter() - started[key]) * 1000, 1), "ok": kind == "done"}
+    while len(took) < len(DETECT_LABELS):
+        worker.drain(on_event); time.sleep(FRAME_BUDGET_MS / 1000)
+    worker.shutdown()
+    return {"detect": took}
+
+def scenario_task(sim):
+    t = {}
+    for name, fn in (("create", core.create_task), ("exists", core.task_exists), ("delete", core.delete_task)):
+        s = time.perf_counter(); fn(); t[name] = round((time.perf_counter() - s) * 1000, 1)
+    return {"schtasks": t}
+
+SCENARIOS = {
+    "enforce_cold": lambda sim: scenario_enforce(sim),
+    "enforce_steady": None,  # second unforced pass over the same machine: state cache hits
+    "agent": scenario_agent,
+    "detection": scenario_detection,
+    "task": scenario_task,
+}
+
+def run_one(name, fn, sim, meter, args):
+    core.inventory.invalidate(); sim.reset_counters(); meter.reset()
+    prof = None
+    if args.profile:
+        import cProfile; prof = cProfile.Profile(); prof.enable()
+    if args.tracemalloc:
+        import tracemalloc; tracemalloc.start()
+    t = time.perf_counter()
+    breakdown = fn(sim)
+    wall = (time.perf_counter() - t) * 1000
+    res = {"wall_ms": round(wall, 1), **sim.counts, "parse_ms": round(meter.ms, 2), "parse_calls": meter.calls,
+           "parsed_rows": meter.rows, "phases": breakdown}
+    if prof:
+        import pstats
+        prof.disable(); s = io.StringIO()
+        pstats.Stats(prof, stream=s).sort_stats("cumulative").print_stats(args.profile_top)
+        res["profile"] = s.getvalue().splitlines()
+    if args.tracemalloc:
+        import tracemalloc
+        snap, (_, peak) = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory(); tracemalloc.stop()
+        res["peak_kib"] = round(peak / 1024, 1)
+        res["top_allocs"] = [str(s) for s in snap.statistics("lineno")[:10]]
+    return res
+
+def regressions(report, baseline, tol, timing=True):
+    """Spawn/round-trip counts must not grow; times (unless profiling skews them) within `tol`."""
+    bad = []
+    for name, cur in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old: continue
+        for metric in ("spawns", "ps_round_trips"):
+            if cur[metric] > old[metric]:
+                bad.append(f"{name}: {metric} {old[metric]} -> {cur[metric]}")
+        for metric, slack in (("parse_ms", 1.0), ("wall_ms", 20.0)) if timing else ():
+            if cur[metric] > old[metric] * (1 + tol) + slack:
+                bad.append(f"{name}: {metric} {old[metric]} -> {cur[metric]}")
+    return bad
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packages", type=int, default=200)
+    ap.add_argument("--latency-scale", type=float, default=0.1, help="multiplier on simwin's default latencies")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--profile", action="store_true")
+    ap.add_argument("--profile-top", type=int, default=25)
+    ap.add_argument("--tracemalloc", action="store_true")
+    ap.add_argument("--out")
+    ap.add_argument("--baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    meter = ParseMeter()
+    lat = {k: v * args.latency_scale for k, v in SimWindows().latency.items()}
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")}, "scenarios": {}}
+    sim = None
+    for name in args.scenarios.split(","):
+        if name != "enforce_steady" or sim is None:  # steady state reuses the previous machine and state cache
+            sim = SimWindows(args.packages, lat, args.fail_rate)
+            if core.STATE_PATH.exists(): core.STATE_PATH.unlink()
+        restore = install(core, sim)
+        try:
+            fn = SCENARIOS[name] or (lambda s: scenario_enforce(s, force=False))
+            report["scenarios"][name] = run_one(name, fn, sim, meter, args)
+        finally:
+            restore()
+    core._log.flush()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    print(text if not args.profile else json.dumps({k: {m: v for m, v in s.items() if m != "profile"}
+                                                    for k, s in report["scenarios"].items()}, indent=2))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            bad = regressions(report, json.load(f), args.tolerance, timing=not (args.profile or args.tracemalloc))
+        for line in bad: print("REGRESSION", line, file=sys.stderr)
+        sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
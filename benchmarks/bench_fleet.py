@@ -0,0 +1,36 @@
+"""Fleet fan-out against N simulated hosts (local subprocesses).
+
+    python benchmarks/bench_fleet.py [--hosts 100] [--concurrency 1,8,32] [--latency 0.2]
+
+Every host is a stand-in subprocess (bloatguard_fleet.FAKE_HOST_SCRIPT);
+a few are unreachable, hung or flaky so timeouts and retries are
+exercised. Reports wall time and throughput per concurrency limit.
+"""
+import os, sys, json, time, asyncio, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloatguard_fleet import fake_transport, run_fleet, summarize
+
+CFG = {"edge": True, "office": True, "copilot_disable": True}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hosts", type=int, default=100)
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--timeout", type=float, default=3.0)
+    args = ap.parse_args()
+    hosts = [f"ws{i}" for i in range(args.hosts - 3)] + ["down1", "hang1", "flaky1"]
+    transport = fake_transport(args.latency)
+    report = {}
+    for c in (int(x) for x in args.concurrency.split(",")):
+        t = time.perf_counter()
+        results = asyncio.run(run_fleet(hosts, CFG, transport, concurrency=c, timeout=args.timeout, retries=1, backoff=0.1))
+        wall = time.perf_counter() - t
+        s = summarize(results)
+        report[f"concurrency={c}"] = {"wall_s": round(wall, 2), "hosts_per_s": round(len(hosts) / wall, 1),
+                                      "ok": s["ok"], "failed": len(s["failed"]), "retried": s["retried"],
+                                      "host_p95_ms": s["host_ms"]["p95"]}
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
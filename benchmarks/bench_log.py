@@ -0,0 +1,56 @@
+"""Log pipeline throughput and write latency vs the old open/append-per-line log().
+
+    python benchmarks/bench_log.py [--records N] [--output-bytes B]
+"""
+import os, sys, time, json, argparse, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloatguard_log import LogPipeline, tail
+
+def legacy_log(path, msg):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(msg.rstrip() + "\n")
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+def bench(records, output_bytes):
+    out = "x" * output_bytes
+    result = {}
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "legacy.log")
+        lat = []
+        t0 = time.perf_counter()
+        for i in range(records):
+            s = time.perf_counter(); legacy_log(path, f"Edge ok=True\n{out}"); lat.append(time.perf_counter() - s)
+        total = time.perf_counter() - t0
+        result["legacy"] = {"records_per_s": round(records / total), "p50_us": round(percentile(lat, .5) * 1e6, 1),
+                            "p99_us": round(percentile(lat, .99) * 1e6, 1), "bytes": os.path.getsize(path)}
+
+        path = os.path.join(d, "pipeline.log")
+        pipe = LogPipeline(path, max_bytes=512 * 1024)
+        lat = []
+        t0 = time.perf_counter()
+        for i in range(records):
+            s = time.perf_counter(); pipe.write("Edge ok=True", item="edge", phase="act", duration_ms=12.5, rc=0, output=out); lat.append(time.perf_counter() - s)
+        enqueued = time.perf_counter() - t0
+        pipe.flush()
+        total = time.perf_counter() - t0
+        archives = sorted(f for f in os.listdir(d) if f.startswith("pipeline.log."))
+        s = time.perf_counter(); last = tail(path, 50); tail_ms = (time.perf_counter() - s) * 1000
+        result["pipeline"] = {"records_per_s": round(records / total), "enqueue_records_per_s": round(records / enqueued),
+                              "p50_us": round(percentile(lat, .5) * 1e6, 1), "p99_us": round(percentile(lat, .99) * 1e6, 1),
+                              "live_bytes": os.path.getsize(path), "archives": archives, "tail50_ms": round(tail_ms, 2),
+                              "tail_ok": len(last) == 50}
+        pipe.close()
+    return result
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=20000)
+    ap.add_argument("--output-bytes", type=int, default=200)
+    args = ap.parse_args()
+    print(json.dumps(bench(args.records, args.output_bytes), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Instrumentation overhead on the run()/run_ps() hot path.
+
+    python benchmarks/bench_metrics.py [--calls 200000]
+
+Replaces the raw seams with no-op fakes and times run() and run_ps()
+with metrics disabled and enabled, then checks the rendered exposition.
+"""
+import os, sys, json, time, argparse, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["PROGRAMDATA"] = tempfile.mkdtemp(prefix="bg-bench-")
+import bloatguard_core as core
+
+def per_call_ns(fn, calls):
+    t = time.perf_counter()
+    for _ in range(calls): fn()
+    return (time.perf_counter() - t) / calls * 1e9
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200000)
+    args = ap.parse_args()
+    core._spawn = lambda cmd, shell=False, timeout=None, until=None: (0, "x" * 100, "")
+    core._ps_round_trip = lambda cmds, timeout=None: [(0, "y" * 100, "") for _ in cmds]
+    cmd = ["winget", "list"]
+    report = {}
+    for enabled in (False, True):
+        core.metrics.enabled = enabled
+        report["enabled" if enabled else "disabled"] = {
+            "raw_ns": round(per_call_ns(lambda: core._spawn(cmd), args.calls)),
+            "run_ns": round(per_call_ns(lambda: core.run(cmd), args.calls)),
+            "run_ps_ns": round(per_call_ns(lambda: core.run_ps("Get-Date"), args.calls)),
+        }
+    text = core.metrics.render()
+    report["exposition_lines"] = len(text.splitlines())
+    report["render_us"] = round(per_call_ns(core.metrics.render, 1000) / 1000, 1)
+    report["spawns_counted"] = f'bloatguard_spawns_total{{exe="winget"}} {args.calls}' in text
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
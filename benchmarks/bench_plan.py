@@ -0,0 +1,62 @@
+"""Dry-run planner: planning cost and estimate accuracy on a simulated Windows backend.
+
+    python benchmarks/bench_plan.py [--rounds 5] [--packages 200] [--latency-scale 0.05]
+
+Each round builds a fresh simulated machine with every built-in item
+installed, plans a forced enforce (reading timing history from the log),
+then runs it. Reports per round the planning time and spawns, the
+estimated vs actual time of the removal/policy work (task time
+summed, so parallel backends count in full), and the estimate
+basis. Round 1 has no history and uses the per-backend defaults scaled by
+the latency factor; later rounds use the timings earlier rounds logged.
+"""
+import os, sys, json, time, argparse, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["PROGRAMDATA"] = tempfile.mkdtemp(prefix="bg-bench-")  # before bloatguard_core is imported
+
+import bloatguard_core as core
+import bloatguard_plan
+from bloatguard_plan import build_plan
+from simwin import SimWindows, install
+
+CFG = dict(core.DEFAULT_CONFIG, edge=True, store=True, office=True, copilot_disable=True, copilot_remove_webxp=True)
+
+def work_ms(results):
+    """Time enforce spent acting (act plus batched remove tasks), summed as the plan sums its steps."""
+    return sum(r.duration_ms for n, r in results.items() if n.split(":")[0] in ("act", "remove"))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--packages", type=int, default=200)
+    ap.add_argument("--latency-scale", type=float, default=0.05)
+    args = ap.parse_args()
+
+    lat = {k: v * args.latency_scale for k, v in SimWindows().latency.items()}
+    bloatguard_plan.DEFAULT_MS = {k: v * args.latency_scale for k, v in bloatguard_plan.DEFAULT_MS.items()}
+    bloatguard_plan.EXPLORER_RESTART_MS *= args.latency_scale
+    rounds = []
+    for n in range(1, args.rounds + 1):
+        sim = SimWindows(args.packages, lat, seed=n)
+        restore = install(core, sim)
+        try:
+            t = time.perf_counter()
+            plan = build_plan(CFG, force=True)
+            plan_ms = (time.perf_counter() - t) * 1000
+            plan_spawns = dict(sim.counts)
+            results = core.enforce(CFG, force=True)
+            core._log.flush()
+        finally:
+            restore()
+        actual = work_ms(results)
+        rounds.append({"round": n, "plan_ms": round(plan_ms, 1), "plan_spawns": plan_spawns["spawns"],
+                       "plan_ps_round_trips": plan_spawns["ps_round_trips"], "steps": len(plan.steps),
+                       "estimated_ms": round(plan.total_ms, 1), "actual_ms": round(actual, 1),
+                       "error_pct": round((plan.total_ms - actual) / actual * 100, 1) if actual else None,
+                       "basis": sorted({s.basis.split(" of ")[0] for s in plan.steps})})
+    print(json.dumps({"config": vars(args), "rounds": rounds}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Streaming runner vs the old subprocess.run runner on a fake winget.
+
+    python benchmarks/bench_proc.py [--rows 50000] [--delay 0.5] [--edge-at 0.3] [--repeat 3]
+
+The fake process prints a winget-style table of `--rows` rows in chunks
+spread over `--delay` seconds, with a "Microsoft Edge" row at the
+`--edge-at` fraction. Reports per runner: wall time, tracemalloc peak of
+the parent, output chars kept, and for the streaming runner the latency
+of an early exit on the Edge row and of a hard timeout on a process that
+forks a hanging child.
+"""
+import os, sys, json, time, argparse, subprocess, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bloatguard_proc import stream
+
+FAKE_WINGET = r"""
+import sys, time
+rows, delay, edge_at = int(sys.argv[1]), float(sys.argv[2]), float(sys.argv[3])
+print("Name" + " " * 36 + "Id" + " " * 34 + "Version        Source")
+print("-" * 100)
+edge, chunk = int(rows * edge_at), max(1, rows // 50)
+for i in range(rows):
+    if i == edge:
+        print(f"{'Microsoft Edge':<40}{'Microsoft.Edge':<36}{'131.0.2903.86':<15}winget")
+    print(f"{'Vendor Tool ' + str(i):<40}{'Vendor.Tool' + str(i):<36}{'1.0.' + str(i):<15}winget")
+    if i % chunk == 0:
+        sys.stdout.flush(); time.sleep(delay / 50)
+"""
+
+# Parent that starts a grandchild and both hang: only a tree kill cleans up.
+FAKE_HANG = r"""
+import sys, time, subprocess
+subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+print("Updating source: winget", flush=True)
+time.sleep(3600)
+"""
+
+def legacy_run(cmd):
+    """The runner before bloatguard_proc: buffer everything, decode, strip."""
+    p = subprocess.run(cmd, capture_output=True, text=True)
+    return p.returncode, p.stdout.strip(), p.stderr.strip()
+
+def is_edge(line):
+    return "microsoft.edge" in line.lower().split()
+
+def measure(fn, repeat):
+    best, peak, res = None, 0, None
+    for _ in range(repeat):
+        tracemalloc.start()
+        t = time.perf_counter()
+        res = tuple(fn())
+        wall = time.perf_counter() - t
+        peak = max(peak, tracemalloc.get_traced_memory()[1]); tracemalloc.stop()
+        best = wall if best is None else min(best, wall)
+    return {"wall_ms": round(best * 1000, 1), "peak_kib": round(peak / 1024, 1), "out_chars": len(res[1]), "rc": res[0]}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--delay", type=float, default=0.5, help="seconds the fake spends emitting output")
+    ap.add_argument("--edge-at", type=float, default=0.3)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=1.0)
+    args = ap.parse_args()
+
+    cmd = [sys.executable, "-c", FAKE_WINGET, str(args.rows), str(args.delay), str(args.edge_at)]
+    report = {"config": vars(args)}
+    report["legacy"] = measure(lambda: legacy_run(cmd), args.repeat)
+    report["stream"] = measure(lambda: stream(cmd), args.repeat)
+    report["stream_capped_64k"] = measure(lambda: stream(cmd, max_output=65536), args.repeat)
+    report["stream_until_edge"] = measure(lambda: stream(cmd, until=is_edge), args.repeat)
+
+    hang = [sys.executable, "-c", FAKE_HANG]
+    t = time.perf_counter()
+    res = stream(hang, timeout=args.timeout)
+    report["stream_timeout"] = {"wall_ms": round((time.perf_counter() - t) * 1000, 1), "rc": res.rc,
+                                "timed_out": res.timed_out, "out": res.out}
+    if os.name != "nt":  # the grandchild must be gone too
+        ps = subprocess.run(["pgrep", "-f", "time.sleep\\(3600\\)"], capture_output=True, text=True).stdout.split()
+        report["stream_timeout"]["leftover_processes"] = len(ps)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
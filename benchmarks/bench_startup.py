@@ -0,0 +1,54 @@
+"""Import-time and import-graph budget for each entry point.
+
+    python benchmarks/bench_startup.py [--budget-ms 100] [--max-modules 80] [--runs 5]
+
+Runs each entry's imports in a fresh interpreter, reports the median
+import time and how many modules it pulls in beyond a bare interpreter,
+and exits non-zero if the enforce/agent paths load a GUI module or blow
+the budget.
+"""
+import os, sys, json, argparse, statistics, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (statement, modules that must not be loaded)
+ENTRIES = {
+    "enforce": ("import bloatguard; import bloatguard_core", ("tkinter", "_tkinter", "ctypes", "asyncio", "bloatguard_gui", "bloatguard_worker")),
+    "agent": ("import bloatguard_agent", ("tkinter", "_tkinter", "ctypes", "asyncio", "bloatguard_gui", "bloatguard_worker")),
+}
+
+PROBE = r"""
+import sys, time, json
+before = set(sys.modules)
+t = time.perf_counter()
+{stmt}
+elapsed = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": elapsed, "new": sorted(set(sys.modules) - before)}}))
+"""
+
+def probe(stmt):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(stmt=stmt)], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float, default=100.0)
+    ap.add_argument("--max-modules", type=int, default=80)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    report, failed = {}, False
+    for name, (stmt, forbidden) in ENTRIES.items():
+        samples = [probe(stmt) for _ in range(args.runs)]
+        new = samples[-1]["new"]
+        bad = sorted(m for m in new if m.split(".")[0] in forbidden)
+        ms = statistics.median(s["ms"] for s in samples)
+        ok = not bad and ms <= args.budget_ms and len(new) <= args.max_modules
+        failed |= not ok
+        report[name] = {"import_ms_median": round(ms, 1), "modules": len(new), "forbidden_loaded": bad, "ok": ok}
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""winget table parse throughput: the old split-on-spaces parser vs column offsets.
+
+    python benchmarks/bench_winget.py [--rows 5000] [--runs 20]
+
+Builds a synthetic `winget list` listing (spinner/progress preamble,
+Available column, names with single spaces, "…" truncation, wide CJK
+names, a footer), checks the column parser against the generated truth
+and reports median parse time cold and memoized, rows/s and row memory.
+"""
+import os, re, sys, json, time, random, argparse, statistics, tracemalloc, unicodedata
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import bloatguard_inventory
+from bloatguard_inventory import Package, parse_winget_list, _parse_winget
+
+WIDTHS = (40, 36, 16, 13)  # Name, Id, Version, Available; Source last
+
+def width(s):
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in s)
+
+def fit(s, w):
+    # winget cuts to the column (leaving one space) and pads by display cells
+    if width(s) > w - 1:
+        while width(s) > w - 2: s = s[:-1]
+        s += "…"
+    return s + " " * (w - width(s))
+
+def synth(n, seed=1):
+    rnd = random.Random(seed)
+    truth, lines = [], []
+    for i in range(n):
+        kind = i % 10
+        name = (f"Vendor{i % 41} Product Suite Enterprise Edition {i}" if kind == 0 else
+                f"微软 工具 {i}" if kind == 1 else f"Vendor{i % 41} Tool {i}")
+        pid = f"Vendor{i % 41}.Products.Enterprise.Suite.Edition{i}" if kind == 2 else f"Vendor{i % 41}.Tool{i}"
+        ver, avail = f"{i % 9}.{i % 13}.{i}", f"{i % 9}.{i % 13}.{i + 1}" if kind == 3 else ""
+        src = "" if kind == 4 else "winget"
+        cells = [fit(name, WIDTHS[0]), fit(pid, WIDTHS[1]), fit(ver, WIDTHS[2]), fit(avail, WIDTHS[3])]
+        lines.append(("".join(cells) + src).rstrip())
+        truth.append((cells[0].strip(), cells[1].strip(), ver, src))
+    header = "".join(h.ljust(w) for h, w in zip(("Name", "Id", "Version", "Available"), WIDTHS)) + "Source"
+    spinner = "".join(f"\r   {c} " for c in "-\\|/" * 5) + "\r  ████▒▒  1.00 MB / 2.00 MB\r" + " " * 40 + "\r"
+    text = "\n".join([spinner + header, "-" * len(header)] + lines + [f"{n // 10} upgrades available."])
+    return text, truth
+
+_COLS = re.compile(r"\s{2,}")
+
+def legacy(text):
+    """The parser before column offsets."""
+    lines = text.splitlines()
+    start = 0
+    for i, line in enumerate(lines):
+        if line.strip() and set(line.strip()) == {"-"}:
+            start = i + 1; break
+    rows = []
+    for line in lines[start:]:
+        parts = _COLS.split(line.strip())
+        if not parts or not parts[0]:
+            continue
+        parts += [""] * (4 - len(parts))
+        source = parts[-1] if len(parts) >= 5 else parts[3]
+        rows.append(Package(parts[0], parts[1], parts[2], source))
+    return rows
+
+def median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter(); fn(); samples.append((time.perf_counter() - t) * 1000)
+    return round(statistics.median(samples), 3)
+
+def wrong(rows, truth):
+    got = [(p.name, p.id, p.version, p.source) for p in rows]
+    return len(truth) - sum(a == b for a, b in zip(got, truth)) + abs(len(got) - len(truth))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--runs", type=int, default=20)
+    args = ap.parse_args()
+
+    text, truth = synth(args.rows)
+    tracemalloc.start(); rows = _parse_winget(text); mem = tracemalloc.get_traced_memory()[0]; tracemalloc.stop()
+    del rows
+    cold = median_ms(lambda: _parse_winget(text), args.runs)
+    bloatguard_inventory._parsed.clear(); parse_winget_list(text)
+    warm = median_ms(lambda: parse_winget_list(text), args.runs)
+    old = median_ms(lambda: legacy(text), args.runs)
+    report = {
+        "rows": args.rows, "bytes": len(text.encode("utf-8")),
+        "legacy": {"ms": old, "rows_per_s": round(args.rows / old * 1000), "wrong_rows": wrong(legacy(text), truth)},
+        "columns": {"ms": cold, "rows_per_s": round(args.rows / cold * 1000), "wrong_rows": wrong(_parse_winget(text), truth),
+                    "row_bytes": round(mem / args.rows)},
+        "memoized": {"ms": warm},
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["columns"]["wrong_rows"] else 0)
+
+if __name__ == "__main__":
+    main()
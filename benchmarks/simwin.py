@@ -0,0 +1,164 @@
+"""Simulated Windows backend for benchmarks: fake winget, PowerShell and schtasks.
+
+Installed into bloatguard_core's raw subprocess seams (_spawn,
+_ps_round_trip, under the run()/run_ps() instrumentation) and registry seam, so the real enforce/detect code runs
+unchanged on any OS. Every simulated process sleeps for its configured
+latency and the backend counts spawns, host round trips and output bytes.
+"""
+import re, json, time, base64, random, threading
+from bloatguard_proc import ProcResult
+
+WINGET_HEADER = "Name                                   Id                                  Version        Available  Source"
+BLOAT_WINGET = [("Microsoft Edge", "Microsoft.Edge", "131.0.2903.86"),
+                ("Microsoft 365 Apps for enterprise - en-us", "Microsoft.Office", "16.0.18129.20158"),
+                ("Microsoft Word 2019", "Microsoft.Word.2019", "16.0.10416.20058")]
+BLOAT_APPX = [("Microsoft.WindowsStore", "Microsoft.WindowsStore_22410.1401.5.0_x64__8wekyb3d8bbwe"),
+              ("MicrosoftWindows.Client.WebExperience", "MicrosoftWindows.Client.WebExperience_524.24900.0.0_x64__cw5n1h2txyewy")]
+
+class SimWindows:
+    """Fake machine with `packages` filler winget rows and Appx packages plus the bloat above."""
+
+    def __init__(self, packages=200, latency=None, fail_rate=0.0, seed=1):
+        self.latency = {"winget_list": 1.5, "winget": 0.8, "ps_spawn": 0.4, "ps": 0.05, "schtasks": 0.1, "explorer": 3.0}
+        self.latency.update(latency or {})
+        self.fail_rate, self.rnd = fail_rate, random.Random(seed)
+        self.winget = {i: (n, i, v) for n, i, v in BLOAT_WINGET}
+        for j in range(packages):
+            pid = f"Vendor{j % 37}.Tool{j}"
+            self.winget[pid] = (f"Vendor{j % 37} Tool {j}", pid, f"{j % 9}.{j % 13}.{j}")
+        self.appx = {full: name for name, full in BLOAT_APPX}
+        for j in range(packages):
+            self.appx[f"Vendor{j % 37}.App{j}_1.{j}.0.0_x64__abcdefghijklm"] = f"Vendor{j % 37}.App{j}"
+        self.tasks = set()
+        self.lock = threading.Lock()
+        self.host_lock = threading.Lock()  # the resident host answers one round trip at a time, as PSHost does
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.counts = {"spawns": 0, "ps_round_trips": 0, "winget": 0, "schtasks": 0, "output_bytes": 0, "failures": 0}
+        self._ps_started = False
+
+    def _cost(self, kind, out, spawn=True, scale=1.0):
+        time.sleep(self.latency[kind] * scale * self.rnd.uniform(0.8, 1.2))
+        with self.lock:
+            self.counts["spawns"] += spawn
+            self.counts["output_bytes"] += len(out.encode("utf-8"))
+
+    def _fails(self):
+        return self.fail_rate and self.rnd.random() < self.fail_rate
+
+    # winget / schtasks / standalone powershell behind run()
+    def run(self, cmd, shell=False, timeout=None, until=None):
+        exe, args = cmd[0].lower(), cmd[1:]
+        if exe == "winget":
+            with self.lock: self.counts["winget"] += 1
+            rc, out = self._winget(args)
+            kind = "winget_list" if args[:1] == ["list"] else "winget"
+            if until is not None:  # streaming early exit: pay only for the lines read
+                lines = out.splitlines()
+                hit = next((n for n, line in enumerate(lines, 1) if until(line)), None)
+                if hit is not None:
+                    out = "\n".join(lines[:hit])
+                    self._cost(kind, out, scale=hit / len(lines))
+                    return ProcResult(0, out, "", stopped_early=True)
+            self._cost(kind, out)
+            return rc, out, ""
+        if exe == "schtasks":
+            with self.lock: self.counts["schtasks"] += 1
+            rc, out = self._schtasks(args)
+            self._cost("schtasks", out)
+            return rc, out, "" if rc == 0 else "ERROR: The system cannot find the file specified."
+        if exe == "powershell" and "-EncodedCommand" in args:  # a script in its own process
+            rc, out, err = self._ps(base64.b64decode(args[args.index("-EncodedCommand") + 1]).decode("utf-16-le"))
+            self._cost("ps_spawn", out)
+            return rc, out, err
+        self._cost("winget", "")
+        return 1, "", f"{cmd[0]}: not simulated"
+
+    def winget_list(self):
+        # winget cuts cells that don't fit their column (one space kept) with "…"
+        fit = lambda s, w: s if len(s) < w else s[:w - 2] + "…"
+        rows = [WINGET_HEADER, "-" * len(WINGET_HEADER)]
+        rows += [f"{fit(n, 39):<39}{fit(i, 36):<36}{fit(v, 15):<15}{'':<11}winget" for n, i, v in self.winget.values()]
+        return "\n".join(rows)
+
+    def _winget(self, args):
+        if args[:1] == ["--version"]:
+            return 0, "v1.9.25200"
+        if args[:1] == ["list"]:
+            return 0, self.winget_list()
+        if args[:1] == ["uninstall"]:
+            pid = args[args.index("--id") + 1] if "--id" in args else args[1]
+            if pid not in self.winget:
+                return -1978335212, "No installed package found matching input criteria."
+            if self._fails():
+                self.counts["failures"] += 1
+                return 1603, f"Found {self.winget[pid][0]} [{pid}]\nUninstall failed with exit code: 1603"
+            name = self.winget.pop(pid)[0]
+            return 0, f"Found {name} [{pid}]\nStarting package uninstall...\nSuccessfully uninstalled"
+        return 1, "unknown winget command"
+
+    def _schtasks(self, args):
+        name = args[args.index("/TN") + 1] if "/TN" in args else ""
+        if "/Create" in args:
+            self.tasks.add(name); return 0, f'SUCCESS: The scheduled task "{name}" has successfully been created.'
+        if "/Delete" in args:
+            if name not in self.tasks: return 1, ""
+            self.tasks.discard(name); return 0, f'SUCCESS: The scheduled task "{name}" was successfully deleted.'
+        if "/Query" in args:
+            return (0, f"{name}  N/A  Ready") if name in self.tasks else (1, "")
+        return 1, ""
+
+    # PowerShell host behind run_ps()/run_ps_batch()
+    def run_ps(self, cmd, timeout=None):
+        return self.run_ps_batch([cmd])[0]
+
+    def run_ps_batch(self, cmds, timeout=None):
+        with self.host_lock:
+            with self.lock:
+                self.counts["ps_round_trips"] += 1
+                first, self._ps_started = not self._ps_started, True
+            if first:
+                self._cost("ps_spawn", "")  # the resident host starts once
+            out = [self._ps(c) for c in cmds]
+            self._cost("ps", "".join(o for _, o, _ in out), spawn=False)
+            return out
+
+    def _ps(self, cmd):
+        if "Get-AppxPackage" in cmd and "ConvertTo-Json" in cmd:
+            return 0, json.dumps([{"Name": n, "PackageFullName": f} for f, n in self.appx.items()]), ""
+        if cmd.startswith("$t = @("):
+            return 0, self._batch(cmd), ""
+        if "Stop-Process" in cmd:  # explorer restart
+            time.sleep(self.latency["explorer"])
+            return 0, "", ""
+        return 0, "", ""
+
+    def _batch(self, script):
+        targets = [t.replace("''", "'") for t in re.findall(r"'((?:[^']|'')*)'", script.splitlines()[0])]
+        lines = []
+        for i, t in enumerate(targets):
+            if "winget uninstall" in script:
+                with self.lock: self.counts["winget"] += 1; self.counts["spawns"] += 1
+                time.sleep(self.latency["winget"])
+                rc, out = self._winget(["uninstall", "--id", t])
+            elif t in self.appx and not self._fails():
+                self.appx.pop(t); rc, out = 0, ""
+            else:
+                self.counts["failures"] += t in self.appx
+                rc, out = 1, f"Deployment failed with HRESULT: 0x80073CF1, Package was not found. {t}"
+            lines += [f"##BG begin {i}", out, f"##BG end {i} {rc}"]
+        return "\n".join(lines)
+
+def install(core, sim):
+    """Point bloatguard_core's raw seams at `sim` (instrumentation stays in place); returns restore()."""
+    from bloatguard_registry import FakeRegistry
+    saved = (core._spawn, core._ps_round_trip, list(core._registry))
+    core._spawn, core._ps_round_trip = sim.run, sim.run_ps_batch
+    core._registry[:] = [FakeRegistry({(r"HKCU\Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced", "ShowCopilotButton"): 1})]
+    core.inventory.invalidate()
+    def restore():
+        core._spawn, core._ps_round_trip = saved[:2]
+        core._registry[:] = saved[2]
+        core.inventory.invalidate()
+    return restore
@@ -0,0 +1,124 @@
+import re
+
+# ---------------------------
+# Batched uninstalls
+# ---------------------------
+# Pending removals are grouped by backend and each group runs as one script:
+# a single ForEach-Object pipeline for Appx on the PowerShell host, and one
+# loop over winget for winget packages in a powershell.exe of its own, so a
+# long winget batch doesn't hold the host the Appx side needs (winget
+# uninstall takes exactly one package per call, so the win there is one
+# spawn, one snapshot and no per-package Python spawn). Every package is bracketed by markers
+#   ##BG begin <n>
+#   ...output...
+#   ##BG end <n> <rc>
+# so success/failure is attributed per package from the combined output.
+
+MARK = "##BG "
+WINGET_FLAGS = "--exact --silent --accept-package-agreements --accept-source-agreements --disable-interactivity"
+PACKAGE_TIMEOUT = 900  # seconds of host time budgeted per package in a batch
+WINGET_NOT_INSTALLED = -1978335212  # 0x8A150014: already gone counts as removed
+_MARK_RE = re.compile(r"^##BG (begin|end) (\d+)(?: (-?\d+))?\s*$")
+
+class Removal:
+    __slots__ = ("item", "backend", "target", "name")
+
+    def __init__(self, item, backend, target, name=None):
+        self.item, self.backend, self.target, self.name = item, backend, target, name or target
+
+    def __repr__(self):
+        return f"Removal({self.item!r}, {self.backend!r}, {self.target!r})"
+
+def removals_for(item, packages):
+    """Removals for an item's matched inventory rows (Appx rows by full name, winget rows by ID)."""
+    return [Removal(item, "appx" if p.source == "appx" else "winget", p.id or p.name, p.name) for p in packages]
+
+def _q(s):
+    return "'" + str(s).replace("'", "''") + "'"
+
+def _targets(targets):
+    return "$t = @(" + ",".join(_q(t) for t in targets) + ")\n"
+
+def winget_script(targets):
+    return _targets(targets) + (
+        "for ($i = 0; $i -lt $t.Count; $i++) {\n"
+        f"  Write-Output ('{MARK}begin ' + $i)\n"
+        f"  $o = & winget uninstall --id $t[$i] {WINGET_FLAGS} 2>&1 | Out-String\n"
+        "  Write-Output $o.Trim()\n"
+        f"  Write-Output ('{MARK}end ' + $i + ' ' + $LASTEXITCODE)\n"
+        "}")
+
+def appx_remove(all_users=False):
+    """The Remove-AppxPackage call: current user only unless `all_users`."""
+    return "Remove-AppxPackage" + (" -AllUsers" if all_users else "")
+
+def appx_script(targets, all_users=False):
+    return _targets(targets) + (
+        "0..($t.Count - 1) | ForEach-Object {\n"
+        "  $i = $_\n"
+        f"  Write-Output ('{MARK}begin ' + $i)\n"
+        f"  try {{ {appx_remove(all_users)} -Package $t[$i] -ErrorAction Stop; $rc = 0 }}\n"
+        "  catch { Write-Output $_.ToString(); $rc = 1 }\n"
+        f"  Write-Output ('{MARK}end ' + $i + ' ' + $rc)\n"
+        "}")
+
+def parse_transcript(text, count):
+    """Split a combined transcript into [(rc, output)] for `count` packages.
+
+    Packages the script never reached (host timeout, crash) report rc 1.
+    """
+    results = [None] * count
+    current, buf = None, []
+    for line in (text or "").splitlines():
+        m = _MARK_RE.match(line)
+        if not m:
+            if current is not None: buf.append(line)
+            continue
+        kind, idx = m.group(1), int(m.group(2))
+        if kind == "begin":
+            current, buf = idx, []
+        elif idx < count:
+            results[idx] = (int(m.group(3) or 1), "\n".join(buf).strip())
+            current, buf = None, []
+    if current is not None and current < count and results[current] is None:
+        results[current] = (1, ("\n".join(buf) + "\n(interrupted)").strip())
+    return [r if r is not None else (1, "not attempted (batch aborted)") for r in results]
+
+class BatchExecutor:
+    """Collects removals and runs one script per backend through `run_ps(cmd, timeout) -> (rc, out, err)`.
+
+    `run_winget` (same signature) runs the winget script instead, e.g. in its
+    own process; `appx_all_users` removes Appx packages for every user.
+    """
+
+    def __init__(self, run_ps, run_winget=None, appx_all_users=False):
+        self.runners = {"winget": run_winget or run_ps, "appx": run_ps}
+        self.scripts = {"winget": winget_script, "appx": lambda t: appx_script(t, appx_all_users)}
+        self.pending = []
+
+    def add(self, removals):
+        self.pending += removals
+        return self
+
+    def run(self):
+        """Return [(removal, ok, output)] in the order removals were added."""
+        done = {}
+        for backend, script in self.scripts.items():
+            # Several items can match the same package (e.g. two globs);
+            # remove it once and report the outcome to each of them.
+            targets = list(dict.fromkeys(r.target for r in self.pending if r.backend == backend))
+            if not targets: continue
+            rc, out, err = self.runners[backend](script(targets), PACKAGE_TIMEOUT * len(targets))
+            for target, (prc, pout) in zip(targets, parse_transcript(out, len(targets))):
+                if prc == 1 and pout.startswith("not attempted") and err: pout += f": {err}"
+                done[backend, target] = (prc == 0 or (backend == "winget" and prc == WINGET_NOT_INSTALLED), pout)
+        out, self.pending = [(r, *done[r.backend, r.target]) for r in self.pending], []
+        return out
+
+def by_item(outcomes):
+    """{item: (ok, output)}: an item succeeds only if all its packages were removed."""
+    items = {}
+    for r, ok, output in outcomes:
+        prev_ok, lines = items.get(r.item, (True, []))
+        items[r.item] = (prev_ok and ok, lines + [f"{r.name}: {'removed' if ok else 'failed'}" + (f"\n{output}" if output else "")])
+    return {k: (ok, "\n".join(lines)) for k, (ok, lines) in items.items()}
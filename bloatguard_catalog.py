@@ -0,0 +1,218 @@
+import re, json
+from pathlib import Path
+from bloatguard_inventory import Package, ELLIPSIS
+from bloatguard_registry import HIVES
+
+# ---------------------------
+# Bloat catalogue
+# ---------------------------
+# Items are data: winget IDs, winget name patterns, Appx name globs,
+# registry policy values and a removal strategy. Built-ins can be extended
+# or overridden by PROGRAM_DATA/bloatguard.catalog.json (or .toml).
+#
+# The catalogue is compiled once into an ID hash map plus one combined
+# regex per package kind, so matching N items against the inventory is a
+# single pass over the packages instead of N scans.
+
+CATALOG_NAMES = ("bloatguard.catalog.json", "bloatguard.catalog.toml")
+REMOVALS = ("winget", "appx", "policy")
+
+BUILTIN_ITEMS = [
+    {"key": "edge", "label": "Microsoft Edge", "removal": "winget",
+     "winget_ids": ["Microsoft.Edge"]},
+    {"key": "store", "label": "Microsoft Store", "removal": "appx",
+     "appx": ["Microsoft.WindowsStore"]},
+    {"key": "office", "label": "Microsoft 365/Office (includes Word & Excel)", "removal": "winget",
+     "winget_ids": ["Microsoft.Office"],
+     "winget_names": [r"^microsoft (?:365|office)\b", r"^microsoft (?:word|excel)\b"]},
+    {"key": "copilot_disable", "label": "Windows Copilot: disable (policy + hide button)", "removal": "policy",
+     "registry": [
+         {"path": r"HKLM\SOFTWARE\Policies\Microsoft\Windows\WindowsCopilot", "name": "TurnOffWindowsCopilot", "value": 1},
+         {"path": r"HKCU\Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced", "name": "ShowCopilotButton", "value": 0},
+     ]},
+    {"key": "copilot_remove_webxp", "label": "Windows Copilot: remove Web Experience Pack (advanced)", "removal": "appx",
+     "appx": ["*WebExperience*"]},
+]
+
+# Patterns are spliced into one combined regex (see _MultiMatcher), so
+# anything that depends on the pattern standing alone is refused.
+_UNSPLICEABLE = re.compile(r"(?<!\\)\(\?[aiLmsux]+\)|\\[1-9]|\\g<|\(\?P[<=]")
+
+def _check_pattern(pat):
+    re.compile(pat)  # surface bad patterns at load time
+    if _UNSPLICEABLE.search(pat):
+        raise ValueError(f"winget_names pattern {pat!r}: inline flags, groups by name and backreferences are not "
+                         "supported (names are matched lowercased; use (?:...) groups)")
+
+def _check_registry(key, r):
+    if not isinstance(r, dict):
+        raise ValueError(f"item {key!r}: registry entries must be objects")
+    path, name = r.get("path"), r.get("name")
+    hive, _, sub = path.partition("\\") if isinstance(path, str) else ("", "", "")
+    if hive.upper() not in HIVES or not sub:
+        raise ValueError(f"item {key!r}: registry path {path!r} must start with {' or '.join(HIVES)}")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"item {key!r}: registry entry {path!r} needs a 'name'")
+    if not isinstance(r.get("value"), (int, str)) or isinstance(r.get("value"), bool):
+        raise ValueError(f"item {key!r}: registry value {name!r} must be an integer or string")
+
+class CatalogItem:
+    __slots__ = ("key", "label", "removal", "winget_ids", "winget_names", "appx", "registry", "builtin")
+
+    def __init__(self, key, label=None, removal="winget", winget_ids=(), winget_names=(), appx=(), registry=(), builtin=False):
+        if not key or not isinstance(key, str):
+            raise ValueError("catalogue item needs a string 'key'")
+        if removal not in REMOVALS:
+            raise ValueError(f"item {key!r}: removal must be one of {REMOVALS}")
+        for pat in winget_names:
+            _check_pattern(pat)
+        for r in registry:
+            _check_registry(key, r)
+        self.key, self.label, self.removal = key, label or key, removal
+        self.winget_ids, self.winget_names = tuple(winget_ids), tuple(winget_names)
+        self.appx = tuple(appx)
+        self.registry = tuple(dict(r) for r in registry)
+        self.builtin = builtin
+
+    @classmethod
+    def from_dict(cls, d, builtin=False):
+        known = {k: d[k] for k in cls.__slots__ if k in d and k != "builtin"}
+        return cls(builtin=builtin, **known)
+
+    def __repr__(self):
+        return f"CatalogItem({self.key!r}, removal={self.removal!r})"
+
+def _read_user_file(path):
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            return []
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get("items", []) if isinstance(data, dict) else data
+
+def load_catalog(data_dir=None, on_error=None):
+    """Built-ins overlaid with user items from `data_dir`; bad entries are reported and skipped."""
+    items = {d["key"]: CatalogItem.from_dict(d, builtin=True) for d in BUILTIN_ITEMS}
+    for name in CATALOG_NAMES if data_dir else ():
+        path = Path(data_dir) / name
+        if not path.exists():
+            continue
+        try:
+            entries = _read_user_file(path)
+        except (OSError, ValueError) as e:
+            if on_error: on_error(f"{path.name}: {e}")
+            continue
+        for d in entries:
+            try:
+                item = CatalogItem.from_dict(d)
+            except (TypeError, ValueError, re.error) as e:
+                if on_error: on_error(f"{path.name}: {e}")
+                continue
+            item.builtin = item.key in items and items[item.key].builtin
+            items[item.key] = item
+    return Catalog(items.values())
+
+class Catalog:
+    def __init__(self, items):
+        self.items = {it.key: it for it in items}
+        self._compiled = None
+
+    def __getitem__(self, key):
+        return self.items[key]
+
+    def __iter__(self):
+        return iter(self.items.values())
+
+    def compiled(self):
+        if self._compiled is None:
+            self._compiled = CompiledCatalog(self)
+        return self._compiled
+
+def glob_to_regex(glob):
+    """Anchored regex for an Appx-style glob (`*` and `?` wildcards)."""
+    return "^" + "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in glob) + "$"
+
+class _MultiMatcher:
+    """All-matches matcher over many patterns with one regex evaluation per name.
+
+    `any_re` is one alternation used as a cheap prefilter; names that hit
+    it are run once through `all_re`, whose optional lookaheads (one
+    named group per pattern) report every pattern that matches.
+    """
+
+    def __init__(self, patterns):
+        self.owners = [key for key, _ in patterns]
+        if not patterns:
+            self.any_re = self.all_re = None
+            return
+        self.any_re = re.compile("|".join(f"(?:{p})" for _, p in patterns))
+        self.all_re = re.compile("^" + "".join(f"(?=.*?(?P<m{i}>{p}))?" for i, (_, p) in enumerate(patterns)), re.S)
+
+    def match(self, text):
+        if self.any_re is None or not self.any_re.search(text):
+            return ()
+        m = self.all_re.match(text)
+        return {self.owners[int(g[1:])] for g, v in m.groupdict().items() if v is not None}
+
+class CompiledCatalog:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.by_id, self.ids = {}, {}  # lowercased ID -> item keys / ID as written
+        names, appx = [], []
+        for it in catalog:
+            for pkg_id in it.winget_ids:
+                self.by_id.setdefault(pkg_id.lower(), []).append(it.key)
+                self.ids.setdefault(pkg_id.lower(), pkg_id)
+            names += [(it.key, p) for p in it.winget_names]
+            appx += [(it.key, glob_to_regex(g.lower())) for g in it.appx]
+        self.names = _MultiMatcher(names)
+        self.appx = _MultiMatcher(appx)
+        self._memo = {}
+
+    def match_winget(self, rows):
+        hits = {}
+        for pkg in rows:
+            keys = set(self.by_id.get(pkg.id.lower(), ())) if pkg.id else set()
+            if not keys and pkg.id.endswith(ELLIPSIS):
+                pkg, keys = self._untruncate(pkg)
+            keys.update(self.names.match(pkg.name.lower()))
+            for k in keys:
+                hits.setdefault(k, []).append(pkg)
+        return hits
+
+    def _untruncate(self, pkg):
+        # winget cut the ID to fit its column; a unique catalogue ID with that
+        # prefix is taken as the package, with the full ID so removal can use it.
+        prefix = pkg.id[:-1].lower()
+        full = [i for i in self.by_id if i.startswith(prefix)]
+        if len(full) != 1:
+            return pkg, set()
+        return Package(pkg.name, self.ids[full[0]], pkg.version, pkg.source), set(self.by_id[full[0]])
+
+    def match_appx(self, rows):
+        hits = {}
+        for pkg in rows:
+            for k in self.appx.match(pkg.name.lower()):
+                hits.setdefault(k, []).append(pkg)
+        return hits
+
+    def _hits(self, inventory, kind):
+        # Memoized per snapshot: the inventory bumps its generation on each load
+        # (generations of different inventories are unrelated, so both are compared).
+        if kind == "winget":
+            rows, gen, fn = inventory.winget_packages(), inventory.winget_gen, self.match_winget
+        else:
+            rows, gen, fn = inventory.appx_packages(), inventory.appx_gen, self.match_appx
+        memo = self._memo.get(kind)
+        if memo is None or memo[0] is not inventory or memo[1] != gen:
+            memo = self._memo[kind] = (inventory, gen, fn(rows))
+        return memo[2]
+
+    def packages(self, inventory, key, kind=None):
+        """Installed packages matching item `key`; only the snapshots the item needs are taken."""
+        it = self.catalog[key]
+        kinds = [kind] if kind else [k for k, used in (("winget", it.winget_ids or it.winget_names), ("appx", it.appx)) if used]
+        return [p for k in kinds for p in self._hits(inventory, k).get(key, ())]
@@ -0,0 +1,217 @@
+import os, sys, csv, json, time, random, asyncio, argparse, statistics
+from bloatguard_core import RESULT_FRAME, load_config
+
+# ---------------------------
+# Fleet mode
+# ---------------------------
+# Runs `--enforce --json` on many machines at once. A transport turns a
+# host name into an argv (ssh, a local stand-in, ...); the enforce config
+# is sent on stdin and the per-item summary comes back as one framed line
+# (RESULT_FRAME, see bloatguard_core). Hosts are fanned out on asyncio
+# with a concurrency limit, a per-attempt timeout and retries; results are
+# streamed to the report as each host finishes.
+
+REMOTE_CMD = r'"C:\Program Files\BloatGuard\BloatGuardAgent.exe" --enforce --json --config -'
+
+class CommandTransport:
+    """argv template; "{host}" and "{attempt}" are substituted per run."""
+
+    def __init__(self, template, env=None):
+        self.template, self.env = list(template), env
+
+    def argv(self, host, attempt=1):
+        return [a.replace("{host}", host).replace("{attempt}", str(attempt)) for a in self.template]
+
+def ssh_transport(remote_cmd=REMOTE_CMD, user=None, connect_timeout=15):
+    target = f"{user}@{{host}}" if user else "{host}"
+    return CommandTransport(["ssh", "-o", "BatchMode=yes", "-o", f"ConnectTimeout={connect_timeout}", target, remote_cmd])
+
+# Stand-in host: reads the config, "enforces" each selected item with a
+# random delay and prints the framed summary. Host names steer failures:
+# "down*" exits 255 like an unreachable ssh target, "hang*" never answers,
+# "flaky*" fails its first attempt.
+FAKE_HOST_SCRIPT = r"""
+import sys, json, time, random
+host, attempt, latency = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+cfg = json.loads(sys.stdin.read() or "{}")
+rnd = random.Random(host)
+if host.startswith("down"): print("ssh: connect to host " + host + ": Connection refused", file=sys.stderr); sys.exit(255)
+if host.startswith("hang"): time.sleep(3600)
+if host.startswith("flaky") and attempt == 1: sys.exit(1)
+items = {}
+for key in sorted(k for k, v in cfg.items() if v is True and k not in ("enforce", "watch", "batch_uninstall", "binder_enabled")):
+    ms = rnd.uniform(0.2, 1.0) * latency * 1000
+    time.sleep(ms / 1000)
+    items[key] = {"present": rnd.random() < 0.5, "ok": rnd.random() > 0.01, "duration_ms": round(ms, 1)}
+print("noise before the frame")
+print("##BGRESULT " + json.dumps({"items": items}), flush=True)
+"""
+
+def fake_transport(latency=0.2):
+    return CommandTransport([sys.executable, "-c", FAKE_HOST_SCRIPT, "{host}", "{attempt}", str(latency)])
+
+# Local host: the real `bloatguard.py --enforce --json --config -` from this
+# checkout, each host name getting its own PROGRAMDATA under `root`.
+LOCAL_HOST_SCRIPT = r"""
+import os, sys, runpy
+host, root, entry = sys.argv[1:4]
+os.environ["PROGRAMDATA"] = os.path.join(root, host)
+sys.argv = [entry, "--enforce", "--json", "--config", "-"]
+sys.path.insert(0, os.path.dirname(entry))
+runpy.run_path(entry, run_name="__main__")
+"""
+
+def local_transport(root=None):
+    import tempfile
+    root = root or tempfile.mkdtemp(prefix="bg-fleet-")
+    entry = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bloatguard.py")
+    return CommandTransport([sys.executable, "-c", LOCAL_HOST_SCRIPT, "{host}", root, entry])
+
+def parse_result(stdout):
+    """The last framed summary in `stdout`; ValueError if there is none or it is malformed."""
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(RESULT_FRAME):
+            res = json.loads(line[len(RESULT_FRAME):])
+            items = res.get("items") if isinstance(res, dict) else None
+            if not isinstance(items, dict) or not all(isinstance(v, dict) for v in items.values()):
+                raise ValueError("malformed result frame")
+            return res
+    raise ValueError("no result frame in output")
+
+async def _attempt(transport, host, attempt, payload, timeout):
+    proc = await asyncio.create_subprocess_exec(
+        *transport.argv(host, attempt), stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE, env=transport.env)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(payload), timeout)
+    except asyncio.TimeoutError:
+        proc.kill(); await proc.wait()
+        raise TimeoutError(f"timed out after {timeout}s")
+    if proc.returncode != 0:
+        raise RuntimeError(f"exit {proc.returncode}: {err.decode('utf-8', 'replace').strip()[-300:]}")
+    return parse_result(out.decode("utf-8", "replace"))
+
+async def run_host(transport, host, cfg, timeout=900, retries=1, backoff=2.0):
+    """Enforce on one host; never raises. Returns a report record."""
+    payload = json.dumps(cfg).encode("utf-8")
+    t0, error = time.perf_counter(), None
+    for attempt in range(1, retries + 2):
+        try:
+            res = await _attempt(transport, host, attempt, payload, timeout)
+            return {"host": host, "ok": all(i.get("ok", True) for i in res["items"].values()), "attempts": attempt,
+                    "duration_ms": round((time.perf_counter() - t0) * 1000, 1), "error": None, "items": res["items"]}
+        except (OSError, ValueError, RuntimeError, TimeoutError) as e:
+            error = str(e) or type(e).__name__
+        if attempt <= retries:
+            await asyncio.sleep(backoff * attempt * random.uniform(0.5, 1.5))
+    return {"host": host, "ok": False, "attempts": retries + 1,
+            "duration_ms": round((time.perf_counter() - t0) * 1000, 1), "error": error, "items": {}}
+
+async def run_fleet(hosts, cfg, transport, concurrency=16, timeout=900, retries=1, backoff=2.0, on_result=None):
+    """Fan out over `hosts`, at most `concurrency` at a time; results in completion order."""
+    sem = asyncio.Semaphore(concurrency)
+    async def one(host):
+        async with sem:
+            return await run_host(transport, host, cfg, timeout, retries, backoff)
+    results = []
+    for fut in asyncio.as_completed([one(h) for h in hosts]):
+        r = await fut
+        results.append(r)
+        if on_result: on_result(r)
+    return results
+
+# ---------------------------
+# Report
+# ---------------------------
+CSV_FIELDS = ["host", "host_ok", "attempts", "host_ms", "error", "item", "present", "item_ok", "item_ms"]
+
+def csv_rows(r):
+    base = [r["host"], r["ok"], r["attempts"], r["duration_ms"], r["error"] or ""]
+    if not r["items"]:
+        return [base + ["", "", "", ""]]
+    return [base + [k, v.get("present"), v.get("ok"), v.get("duration_ms")] for k, v in sorted(r["items"].items())]
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+def summarize(results):
+    per_item = {}
+    for r in results:
+        for k, v in r["items"].items():
+            e = per_item.setdefault(k, {"ms": [], "ok": 0, "failed": 0})
+            if v.get("duration_ms") is not None: e["ms"].append(v["duration_ms"])
+            e["ok" if v.get("ok", True) else "failed"] += 1
+    host_ms = [r["duration_ms"] for r in results]
+    return {
+        "hosts": len(results), "ok": sum(r["ok"] for r in results),
+        "failed": sorted(r["host"] for r in results if not r["ok"]),
+        "retried": sorted(r["host"] for r in results if r["attempts"] > 1),
+        "host_ms": {"p50": _pct(host_ms, .5), "p95": _pct(host_ms, .95), "max": max(host_ms, default=None)},
+        "items": {k: {"ok": e["ok"], "failed": e["failed"], "p50_ms": _pct(e["ms"], .5), "p95_ms": _pct(e["ms"], .95),
+                      "mean_ms": round(statistics.fmean(e["ms"]), 1) if e["ms"] else None}
+                  for k, e in sorted(per_item.items())},
+    }
+
+class Report:
+    """Streams host results to `path`: CSV rows as they arrive, or JSON (summary + hosts) on close."""
+
+    def __init__(self, path):
+        self.path, self.results = path, []
+        self.csv = str(path).lower().endswith(".csv")
+        self._f = open(path, "w", newline="", encoding="utf-8") if self.csv else None
+        if self._f:
+            self._w = csv.writer(self._f); self._w.writerow(CSV_FIELDS); self._f.flush()
+
+    def add(self, r):
+        self.results.append(r)
+        if self._f:
+            self._w.writerows(csv_rows(r)); self._f.flush()
+
+    def close(self, meta=None):
+        if self._f:
+            self._f.close(); return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta or {}, "summary": summarize(self.results),
+                       "hosts": sorted(self.results, key=lambda r: r["host"])}, f, indent=2)
+        os.replace(tmp, self.path)
+
+# ---------------------------
+# CLI
+# ---------------------------
+def read_hosts(path):
+    text = sys.stdin.read() if path == "-" else open(path, encoding="utf-8").read()
+    hosts = [h.split("#")[0].strip() for h in text.splitlines()]
+    return list(dict.fromkeys(h for h in hosts if h))
+
+def main(argv=None):
+    """bloatguard --fleet HOSTS [--config CFG] [--report out.json|out.csv] ..."""
+    ap = argparse.ArgumentParser(prog="bloatguard --fleet")
+    ap.add_argument("--fleet", required=True, metavar="HOSTS", help="file with one host per line ('-' for stdin)")
+    ap.add_argument("--config", help="enforce config JSON sent to every host (default: this machine's)")
+    ap.add_argument("--report", default="fleet-report.json")
+    ap.add_argument("--transport", choices=("ssh", "local", "fake"), default="ssh")
+    ap.add_argument("--ssh-user")
+    ap.add_argument("--remote-cmd", default=REMOTE_CMD)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--timeout", type=float, default=900, help="seconds per attempt")
+    ap.add_argument("--retries", type=int, default=1)
+    args, _ = ap.parse_known_args(argv)
+
+    cfg = load_config(args.config)
+    hosts = read_hosts(args.fleet)
+    transport = (fake_transport() if args.transport == "fake" else local_transport() if args.transport == "local"
+                 else ssh_transport(args.remote_cmd, args.ssh_user))
+    report = Report(args.report)
+    def progress(r):
+        report.add(r)
+        print(f"[{len(report.results)}/{len(hosts)}] {r['host']}: {'ok' if r['ok'] else 'FAILED ' + (r['error'] or 'item failures')}"
+              f" ({r['duration_ms'] / 1000:.1f}s, attempts={r['attempts']})", flush=True)
+    t0 = time.perf_counter()
+    results = asyncio.run(run_fleet(hosts, cfg, transport, args.concurrency, args.timeout, args.retries, on_result=progress))
+    report.close({"hosts": len(hosts), "concurrency": args.concurrency, "timeout": args.timeout,
+                  "retries": args.retries, "transport": args.transport, "wall_s": round(time.perf_counter() - t0, 2)})
+    failed = [r for r in results if not r["ok"]]
+    print(f"{len(results) - len(failed)}/{len(results)} hosts ok; report: {args.report}")
+    return 1 if failed else 0
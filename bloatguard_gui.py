@@ -0,0 +1,262 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from bloatguard_core import (
+    APP_NAME, PROGRAM_DATA, load_config, save_config, is_admin, relaunch_as_admin,
+    detect_edge, detect_store, detect_office, detect_copilot_present,
+    create_task, delete_task, task_exists, winget_available, catalog, set_appx_all_users, log,
+    enforce_items, enforcement_tasks, log_results, log_run_start, log_run_end,
+)
+from bloatguard_plan import build_plan
+from bloatguard_worker import Worker, LoopMonitor, FRAME_BUDGET_MS
+
+# ---------------------------
+# GUI
+# ---------------------------
+# key -> (status label prefix, detector, present text, absent text)
+DETECT_LABELS = {
+    "edge":    ("Edge", lambda: detect_edge(), "✅ Present", "✔️ Not installed"),
+    "store":   ("Microsoft Store", lambda: detect_store(), "✅ Present", "✔️ Not installed"),
+    "office":  ("Office/365", lambda: detect_office(), "✅ Present", "✔️ Not installed"),
+    "copilot": ("Windows Copilot", lambda: detect_copilot_present(), "✅ Enabled/Present", "✔️ Disabled/Not detected"),
+}
+
+class App(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title(APP_NAME); self.geometry("660x600"); self.resizable(False, False)
+        self.cfg = load_config()
+        set_appx_all_users(self.cfg.get("appx_all_users"))
+
+        # Admin banner
+        top = ttk.Frame(self, padding=10); top.pack(fill="x")
+        ttk.Label(top, text="Running as Administrator ✅" if is_admin() else "Not elevated ❌ — click Elevate").pack(side="left")
+        ttk.Button(top, text="Elevate", command=self.on_elevate).pack(side="right")
+
+        # Detection
+        det = ttk.LabelFrame(self, text="Detection", padding=10); det.pack(fill="x", padx=10, pady=6)
+        self.edge_status  = ttk.Label(det, text="Edge: (checking...)"); self.edge_status.pack(anchor="w")
+        self.store_status = ttk.Label(det, text="Microsoft Store: (checking...)"); self.store_status.pack(anchor="w")
+        self.office_status= ttk.Label(det, text="Office/365 (Word/Excel): (checking...)"); self.office_status.pack(anchor="w")
+        self.copilot_status=ttk.Label(det, text="Windows Copilot: (checking...)"); self.copilot_status.pack(anchor="w")
+
+        # Choices
+        box = ttk.LabelFrame(self, text="Select items to remove / disable (consent-based)", padding=10); box.pack(fill="x", padx=10, pady=6)
+        self.var_edge   = tk.BooleanVar(value=self.cfg.get("edge", False))
+        self.var_store  = tk.BooleanVar(value=self.cfg.get("store", False))
+        self.var_office = tk.BooleanVar(value=self.cfg.get("office", False))
+        self.var_copilot_disable = tk.BooleanVar(value=self.cfg.get("copilot_disable", False))
+        self.var_copilot_remove  = tk.BooleanVar(value=self.cfg.get("copilot_remove_webxp", False))
+
+        ttk.Checkbutton(box, text="Microsoft Edge", variable=self.var_edge).pack(anchor="w")
+        ttk.Checkbutton(box, text="Microsoft Store (not recommended; may break features)", variable=self.var_store).pack(anchor="w")
+        ttk.Checkbutton(box, text="Microsoft 365/Office (includes Word & Excel)", variable=self.var_office).pack(anchor="w")
+        ttk.Checkbutton(box, text="Windows Copilot: disable (policy + hide button)", variable=self.var_copilot_disable).pack(anchor="w")
+        ttk.Checkbutton(box, text="Windows Copilot: remove Web Experience Pack (advanced)", variable=self.var_copilot_remove).pack(anchor="w")
+        # Extra items from the user's catalogue file
+        self.extra_vars = {it.key: (it, tk.BooleanVar(value=self.cfg.get(it.key, False))) for it in catalog() if not it.builtin}
+        for it, var in self.extra_vars.values():
+            ttk.Checkbutton(box, text=f"{it.label} (catalogue)", variable=var).pack(anchor="w")
+        if self.extra_vars: self.geometry(f"660x{600 + 24 * len(self.extra_vars)}")
+
+        # Binder UI
+        bind = ttk.LabelFrame(self, text="Copilot key binder (Win+C → your app)", padding=10); bind.pack(fill="x", padx=10, pady=6)
+        self.var_binder = tk.BooleanVar(value=self.cfg.get("binder_enabled", False))
+        self.binder_path = tk.StringVar(value=self.cfg.get("binder_target", ""))
+
+        row = ttk.Frame(bind); row.pack(fill="x")
+        ttk.Checkbutton(row, text="Enable binder", variable=self.var_binder).pack(side="left")
+        ttk.Entry(row, textvariable=self.binder_path, width=60).pack(side="left", padx=6)
+        ttk.Button(row, text="Browse…", command=self.pick_app).pack(side="left")
+
+        # Enforce
+        enf = ttk.LabelFrame(self, text="Ongoing enforcement (optional, transparent)", padding=10); enf.pack(fill="x", padx=10, pady=6)
+        self.var_enforce = tk.BooleanVar(value=self.cfg.get("enforce", False))
+        ttk.Checkbutton(enf, text="Re-check at logon and re-apply selected items", variable=self.var_enforce).pack(anchor="w")
+
+        # Actions
+        actions = ttk.Frame(self, padding=10); actions.pack(fill="x")
+        ttk.Button(actions, text="Save Choices", command=self.on_save).pack(side="left")
+        ttk.Button(actions, text="Apply Now", command=self.on_apply_now).pack(side="left", padx=10)
+        ttk.Button(actions, text="Open Data Folder", command=lambda: os.startfile(PROGRAM_DATA)).pack(side="right")
+        ttk.Button(actions, text="Remove Enforce Task", command=self.on_remove_task).pack(side="right", padx=8)
+
+        note = ttk.Label(self, wraplength=620, foreground="#444",
+            text="Removing Microsoft Store may impact Windows features. Copilot removal uses policy + (optionally) uninstalls the Web Experience Pack. Binder requires admin and runs in the Agent.")
+        note.pack(padx=10, pady=6)
+
+        # Detection and Apply Now run on worker threads; _pump drains their
+        # results on the Tk thread and records how late each tick fires.
+        self.worker = Worker()
+        self.loop_monitor = LoopMonitor(FRAME_BUDGET_MS)
+        self.apply_win = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(FRAME_BUDGET_MS, self._pump)
+        self.after(200, self.refresh_detection)
+        self.worker.submit("winget", winget_available)  # may run `winget list`: never on the Tk thread
+
+    def _pump(self):
+        try:
+            self.loop_monitor.tick()
+            self.worker.drain(self.on_worker_event)
+        finally:
+            self.after(FRAME_BUDGET_MS, self._pump)  # one bad message must not stop the pump
+
+    def on_close(self):
+        log("GUI main loop", phase="gui", ok=self.loop_monitor.within(), **self.loop_monitor.summary())
+        self.worker.shutdown(); self.destroy()
+
+    def on_elevate(self):
+        relaunch_as_admin(); self.after(800, self.destroy)
+
+    def ensure_admin(self):
+        if is_admin(): return True
+        messagebox.showwarning(APP_NAME, "Please run elevated (Administrator) to proceed."); return False
+
+    def pick_app(self):
+        path = filedialog.askopenfilename(title="Select application or file to open")
+        if path: self.binder_path.set(path)
+
+    def status_label(self, key):
+        return {"edge": self.edge_status, "store": self.store_status,
+                "office": self.office_status, "copilot": self.copilot_status}[key]
+
+    def refresh_detection(self):
+        for key, (title, detect, _, _) in DETECT_LABELS.items():
+            self.status_label(key).config(text=f"{title}: (checking...)")
+            self.worker.submit(f"detect:{key}", detect)
+
+    def on_worker_event(self, kind, key, payload):
+        # Task-graph progress first: Apply's graph has detect:<key> tasks too.
+        if kind in ("start", "task"):
+            if self.apply_win is not None: self.on_apply_event(kind, key, payload)
+        elif key.startswith("detect:") and key[7:] in DETECT_LABELS:
+            title, _, yes, no = DETECT_LABELS[key[7:]]
+            text = f"(error: {payload})" if kind == "error" else (yes if payload else no)
+            self.status_label(key[7:]).config(text=f"{title}: {text}")
+        elif key == "winget":
+            if kind == "error" or not payload:
+                messagebox.showwarning(APP_NAME, "winget is required for some actions. Please install/enable it first.", parent=self)
+        elif key == "plan":
+            self.on_plan(kind, payload)
+        elif self.apply_win is not None:
+            self.on_apply_event(kind, key, payload)
+
+    def on_save(self):
+        self.cfg.update({
+            "edge": self.var_edge.get(),
+            "store": self.var_store.get(),
+            "office": self.var_office.get(),
+            "copilot_disable": self.var_copilot_disable.get(),
+            "copilot_remove_webxp": self.var_copilot_remove.get(),
+            "enforce": self.var_enforce.get(),
+            "binder_enabled": self.var_binder.get(),
+            "binder_target": self.binder_path.get().strip(),
+            **{key: var.get() for key, (_, var) in self.extra_vars.items()},
+        })
+        save_config(self.cfg)
+
+        if self.cfg["enforce"]:
+            if not self.ensure_admin(): return
+            ok, msg = create_task()
+            messagebox.showinfo(APP_NAME, "Enforce task created." if ok else f"Failed to create task:\n{msg}")
+        else:
+            if task_exists():
+                ok, msg = delete_task()
+                if not ok: messagebox.showerror(APP_NAME, f"Failed to remove task:\n{msg}")
+
+        messagebox.showinfo(APP_NAME, "Configuration saved.")
+
+    def on_apply_now(self):
+        if not self.ensure_admin(): return
+        if self.apply_win is not None:
+            self.apply_win.lift(); return
+        selected = {
+            "edge": self.var_edge.get(), "store": self.var_store.get(), "office": self.var_office.get(),
+            "copilot_disable": self.var_copilot_disable.get(), "copilot_remove_webxp": self.var_copilot_remove.get(),
+            **{key: var.get() for key, (_, var) in self.extra_vars.items()},
+        }
+        if not any(selected.values()):
+            messagebox.showinfo(APP_NAME, "No items selected."); return
+        # Preview first: the planner snapshots and reads history on a worker.
+        self.config(cursor="watch")
+        self.worker.submit("plan", lambda: build_plan({**self.cfg, **selected}, force=True))
+
+    def on_plan(self, kind, plan):
+        self.config(cursor="")
+        if kind == "error":
+            messagebox.showerror(APP_NAME, f"Could not plan the changes:\n{plan}"); return
+        if not plan.steps:
+            messagebox.showinfo(APP_NAME, "Nothing to do.\n\n" + plan.render()); return
+        win = tk.Toplevel(self); win.title(f"{APP_NAME} — Preview"); win.transient(self)
+        text = tk.Text(win, width=100, height=min(30, plan.render().count("\n") + 2), wrap="none")
+        text.insert("1.0", plan.render()); text.config(state="disabled"); text.pack(padx=10, pady=10)
+        row = ttk.Frame(win); row.pack(pady=(0, 10))
+        ttk.Button(row, text="Apply", command=lambda: (win.destroy(), self.start_apply(plan.keys()))).pack(side="left", padx=6)
+        ttk.Button(row, text="Cancel", command=win.destroy).pack(side="left", padx=6)
+
+    def start_apply(self, keys):
+        # The same task graph enforce() runs, batched as the preview said:
+        # snapshot -> detect -> one remove:<backend> per backend -> act:<key>.
+        cat = catalog()
+        keys = [k for k in keys if k in cat]
+        items = enforce_items()
+        tasks = enforcement_tasks({k: True for k in keys}, items, batch=self.cfg.get("batch_uninstall", True))
+
+        # Live progress list; one row per item (its act:<key> task).
+        win = self.apply_win = tk.Toplevel(self); win.title(f"{APP_NAME} — Applying"); win.transient(self)
+        win.protocol("WM_DELETE_WINDOW", self.on_apply_cancel)
+        self.apply_rows = {f"act:{k}": cat[k].label for k in keys}
+        self.apply_backends = {f"act:{k}": cat[k].removal for k in keys}
+        self.apply_list = tk.Listbox(win, width=70, height=len(keys) + 1); self.apply_list.pack(padx=10, pady=10)
+        for label in self.apply_rows.values(): self.apply_list.insert("end", f"… {label} — queued")
+        self.apply_btn = ttk.Button(win, text="Cancel", command=self.on_apply_cancel); self.apply_btn.pack(pady=(0, 10))
+        # Logged like an enforce run so the planner learns from Apply timings too.
+        log_run_start("apply")
+        self.worker.run_tasks("apply", tasks, finish=lambda results: (log_results(results, items), log_run_end("apply")))
+
+    def on_apply_cancel(self):
+        if self.apply_btn.cget("text") == "Close":
+            self.apply_win.destroy(); self.apply_win = None; return
+        self.worker.cancel(); self.apply_btn.config(text="Cancelling…", state="disabled")
+
+    def set_apply_row(self, name, icon, text):
+        i = list(self.apply_rows).index(name)
+        self.apply_list.delete(i); self.apply_list.insert(i, f"{icon} {self.apply_rows[name]} — {text}")
+
+    def on_apply_event(self, kind, key, payload):
+        if kind == "start":
+            if key.startswith("remove:"):  # a batch acts for every item of its backend
+                for name, backend in self.apply_backends.items():
+                    if backend == key[7:]: self.set_apply_row(name, "▶", "running (batched)")
+            elif key in self.apply_rows:
+                self.set_apply_row(key, "▶", "running")
+        elif kind == "task" and key in self.apply_rows:
+            r = payload
+            if r.skipped: self.set_apply_row(key, "⏭", r.error)
+            elif r.ok and r.value is None: self.set_apply_row(key, "✔", "not present")
+            else:
+                ok = r.ok and r.value[0]
+                self.set_apply_row(key, "✔" if ok else "✖", f"{r.duration_ms/1000:.1f}s")
+        elif kind in ("done", "error") and key == "apply":
+            self.apply_btn.config(text="Close", state="normal")
+            if kind == "error":
+                messagebox.showerror(APP_NAME, payload, parent=self.apply_win)
+            else:
+                summary = []
+                for name, label in self.apply_rows.items():
+                    r = payload[name]
+                    ok, msg = (True, "Not present.") if r.ok and r.value is None else r.value if r.ok else (False, r.error)
+                    summary.append(f"[{label}] success={ok} ({r.duration_ms/1000:.1f}s)\n{msg}\n")
+                messagebox.showinfo(APP_NAME, "\n".join(summary), parent=self.apply_win)
+            self.refresh_detection()
+
+    def on_remove_task(self):
+        if not task_exists():
+            messagebox.showinfo(APP_NAME, "No enforce task found."); return
+        if not self.ensure_admin(): return
+        ok, msg = delete_task()
+        messagebox.showinfo(APP_NAME, "Enforce task removed." if ok else f"Failed to remove task:\n{msg}")
+
+def run_gui():
+    app = App(); app.mainloop()
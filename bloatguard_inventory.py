@@ -0,0 +1,237 @@
+import re, json, hashlib, threading, unicodedata
+
+# ---------------------------
+# Package inventory snapshot
+# ---------------------------
+# One `winget list` and one `Get-AppxPackage` per run; every detector
+# queries the parsed table instead of spawning its own process. Appx
+# packages are listed for the current user unless all users are selected.
+
+WINGET_LIST = ["winget", "list", "--accept-source-agreements"]
+WINGET_LIST_TIMEOUT = 300  # a hung source update must not block enforcement
+APPX_SNAPSHOT_PS = "Get-AppxPackage | Select-Object Name,PackageFullName | ConvertTo-Json -Compress"
+APPX_ALL_USERS_PS = "Get-AppxPackage -AllUsers | Select-Object Name,PackageFullName | ConvertTo-Json -Compress"
+
+_COLS = re.compile(r"\s{2,}")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+_VT = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+ELLIPSIS = "\u2026"  # winget's marker for a cell cut to fit its column
+PARSE_MEMO = 4  # distinct `winget list` outputs kept parsed
+
+class Package:
+    __slots__ = ("name", "id", "version", "source")
+
+    def __init__(self, name, id="", version="", source=""):
+        self.name, self.id, self.version, self.source = name, id, version, source
+
+    @property
+    def truncated(self):
+        return self.name.endswith(ELLIPSIS) or self.id.endswith(ELLIPSIS)
+
+    def __repr__(self):
+        return f"Package({self.name!r}, {self.id!r}, {self.version!r}, {self.source!r})"
+
+# ---------------------------
+# winget table parser
+# ---------------------------
+# winget pads every cell to its column, so column offsets are read once
+# from the header above the dashed separator and each row is sliced at
+# those offsets; names with spaces, empty Available cells and "…"
+# truncation all fall out of that. The spinner and progress bar are
+# redrawn in place with \r (and VT sequences on newer builds), so only the
+# text after the last \r on a line is kept. Padding counts terminal cells:
+# rows with wide (CJK) characters are cut by display width, and a row that
+# still doesn't line up falls back to splitting on runs of spaces.
+
+def _clean(line):
+    if "\x1b" in line:
+        line = _VT.sub("", line)
+    if "\r" in line:
+        line = line.rstrip().rsplit("\r", 1)[-1]
+    return line.rstrip()
+
+def _is_rule(line):
+    if "---" not in line:
+        return False
+    s = line.strip()
+    return s.strip("-") == ""
+
+def _row_re(offsets):
+    # Slices a padded ASCII row and checks that every column boundary falls
+    # on a space, in one match.
+    widths = [b - a - 1 for a, b in zip(offsets, offsets[1:])]
+    return re.compile(f".{{{offsets[0]}}}" + "".join(f"(.{{{w}}}) " for w in widths) + "(.*)")
+
+def _char_bounds(line, offsets):
+    """Map column offsets in terminal cells to string indices."""
+    deltas = []  # (index, cells - 1) for each non-ASCII char not one cell wide
+    for m in _NON_ASCII.finditer(line):
+        ch = m.group()
+        w = 2 if unicodedata.east_asian_width(ch) in "WF" else 0 if unicodedata.combining(ch) else 1
+        if w != 1: deltas.append((m.start(), w - 1))
+    if not deltas:
+        return offsets
+    bounds, shift, k = [], 0, 0
+    for o in offsets:
+        while k < len(deltas) and deltas[k][0] + shift < o:
+            shift += deltas[k][1]; k += 1
+        bounds.append(o - shift)
+    return bounds
+
+def _cells(line, offsets):
+    bounds = _char_bounds(line, offsets)
+    if any(0 < b < len(line) and line[b - 1] != " " for b in bounds):
+        return _COLS.split(line.strip())  # misaligned: best effort
+    return [line[a:b].strip() for a, b in zip(bounds, bounds[1:] + [None])]
+
+def _parse_winget(text):
+    rows, offsets, prev, prev_row = [], None, "", False
+    for raw in text.split("\n"):  # not splitlines(): a \r redraw belongs to its line
+        line = _clean(raw)
+        if _is_rule(line):
+            if prev_row: rows.pop()  # a header read as a row before its rule
+            offsets = [m.start() for m in re.finditer(r"\S+", prev)] or None
+            if offsets: row_re, width = _row_re(offsets), offsets[-1]
+            prev, prev_row = "", False
+            continue
+        prev, prev_row = line, False
+        if offsets is None or not line:
+            continue
+        m = row_re.match(line.ljust(width)) if line.isascii() else None
+        parts = [g.strip() for g in m.groups()] if m else _cells(line, offsets)
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            continue  # footers like "3 upgrades available."
+        parts += [""] * (4 - len(parts))
+        # winget columns: Name, Id, Version, [Available], Source
+        rows.append(Package(parts[0], parts[1], parts[2], parts[-1] if len(parts) >= 5 else parts[3]))
+        prev_row = True
+    return tuple(rows)
+
+_parsed = {}
+
+def parse_winget_list(text):
+    """Parse `winget list` table output into Package rows (a shared, read-only tuple).
+
+    Results are memoized by a hash of the output, so re-snapshots of an
+    unchanged machine cost one hash.
+    """
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    rows = _parsed.get(key)
+    if rows is None:
+        rows = _parse_winget(text)
+        if len(_parsed) >= PARSE_MEMO:
+            _parsed.pop(next(iter(_parsed)), None)
+        _parsed[key] = rows
+    return rows
+
+def parse_appx_json(text):
+    """Parse `ConvertTo-Json` output of Get-AppxPackage into Package rows.
+
+    Empty output means no packages; anything else that isn't a JSON object
+    or list (a warning ahead of the JSON, a cut-off listing) raises
+    ValueError rather than reading as "nothing installed".
+    """
+    if not text.strip():
+        return []
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError(f"unexpected Get-AppxPackage output: {text.strip()[:80]!r}")
+    return [Package(d.get("Name") or "", d.get("PackageFullName") or "", source="appx")
+            for d in data if isinstance(d, dict)]
+
+class SnapshotError(RuntimeError):
+    """A package listing failed or timed out; nothing is known about what is installed."""
+
+def _failure(what, rc, out, err):
+    detail = (err or out or "").strip().splitlines()
+    return f"{what} failed (rc {rc})" + (f": {detail[-1][:200]}" if detail else "")
+
+class Inventory:
+    """Lazily-taken snapshot of installed winget and Appx packages.
+
+    `run` and `run_ps` are the calling module's subprocess seams, so canned
+    output can be fed in for tests. Call `invalidate()` after a mutating
+    action; the next query re-snapshots. A listing that fails raises
+    SnapshotError from every query until then, rather than reading as
+    "nothing installed".
+    """
+
+    def __init__(self, run, run_ps):
+        self._run, self._run_ps = run, run_ps
+        self._wlock = threading.RLock()
+        self._alock = threading.RLock()
+        self._winget = self._winget_err = None
+        self._appx = self._appx_err = None
+        self._winget_ok = None
+        self.appx_all_users = False
+        self.appx_fallback = False  # last all-users listing failed; the current user's was used
+        self.winget_gen = self.appx_gen = 0  # bumped on every (re)load
+
+    def invalidate(self):
+        with self._wlock, self._alock:
+            self._winget = self._appx = self._winget_err = self._appx_err = None
+            self.appx_fallback = False
+
+    def set_appx_all_users(self, all_users):
+        with self._alock:
+            if all_users != self.appx_all_users:
+                self.appx_all_users, self._appx, self._appx_err = all_users, None, None
+                self.appx_fallback = False
+
+    # winget side
+    def _load_winget(self):
+        with self._wlock:
+            if self._winget is None and self._winget_err is None:
+                self._store_winget(*self._run(WINGET_LIST, timeout=WINGET_LIST_TIMEOUT))
+            if self._winget_err:
+                raise SnapshotError(self._winget_err)
+            return self._winget
+
+    def _store_winget(self, rc, out, err=""):
+        if rc != 0:
+            if self._winget_ok is None:
+                rc2, _, _ = self._run(["winget", "--version"], timeout=60)
+                self._winget_ok = rc2 == 0
+            self._winget_err = _failure("winget list", rc, out, err) if self._winget_ok else "winget not available"
+            return
+        self._winget_ok = True
+        rows = parse_winget_list(out)
+        self._winget = rows
+        self.winget_gen += 1
+
+    def winget_available(self) -> bool:
+        try:
+            self._load_winget()
+        except SnapshotError:
+            pass
+        return bool(self._winget_ok)
+
+    def winget_packages(self):
+        return list(self._load_winget())
+
+    # Appx side
+    def _load_appx(self):
+        with self._alock:
+            if self._appx is None and self._appx_err is None:
+                rc, out, err = self._run_ps(APPX_ALL_USERS_PS if self.appx_all_users else APPX_SNAPSHOT_PS)
+                if rc != 0 and self.appx_all_users:
+                    # -AllUsers needs elevation; list what the current user can see instead
+                    rc, out, err = self._run_ps(APPX_SNAPSHOT_PS)
+                    self.appx_fallback = rc == 0
+                if rc != 0:
+                    self._appx_err = _failure("Get-AppxPackage", rc, out, err)
+                else:
+                    try:
+                        self._appx = parse_appx_json(out)
+                        self.appx_gen += 1
+                    except ValueError as e:
+                        self._appx_err = f"Get-AppxPackage output unreadable: {e}"
+            if self._appx_err:
+                raise SnapshotError(self._appx_err)
+            return self._appx
+
+    def appx_packages(self):
+        return list(self._load_appx())
+
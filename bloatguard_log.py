@@ -0,0 +1,155 @@
+import os, io, json, time, queue, atexit, threading
+from datetime import datetime
+from pathlib import Path
+
+# ---------------------------
+# Structured log pipeline
+# ---------------------------
+# log() only formats a record and enqueues it; one background thread keeps
+# the file open, writes whatever has queued up as a batch of JSON lines and
+# rotates by size into gzip archives (bloatguard.log.1.gz, .2.gz, ...).
+
+MAX_BYTES = 1024 * 1024
+BACKUPS = 5
+MAX_OUTPUT = 4000  # chars of winget/PowerShell output kept per record
+
+def truncate(text, limit=MAX_OUTPUT):
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit] + f"… [{len(text) - limit} chars truncated]"
+
+def make_record(msg="", item=None, phase=None, duration_ms=None, rc=None, output=None, ts=None, **extra):
+    when = datetime.fromtimestamp(ts) if ts is not None else datetime.now()
+    rec = {"ts": when.astimezone().isoformat(timespec="milliseconds")}
+    if msg: rec["msg"] = msg.rstrip()
+    if item is not None: rec["item"] = item
+    if phase is not None: rec["phase"] = phase
+    if duration_ms is not None: rec["duration_ms"] = round(duration_ms, 1)
+    if rc is not None: rec["rc"] = rc
+    if output: rec["output"] = truncate(output.strip())
+    rec.update((k, v) for k, v in extra.items() if v is not None)
+    return rec
+
+class LogPipeline:
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path, self.max_bytes, self.backups = Path(path), max_bytes, backups
+        self._q = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+
+    def write(self, msg="", **fields):
+        """Enqueue one record; never blocks on disk. Formatting happens on the writer thread."""
+        if self._thread is None:
+            self._ensure_thread()
+        self._q.put((time.time(), msg, fields))
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="bg-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def flush(self):
+        """Block until everything enqueued so far is on disk."""
+        if self._thread is not None:
+            self._q.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(None); self._thread.join(5)
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return self.path.open("a", encoding="utf-8")
+
+    def _writer(self):
+        f = None
+        while True:
+            batch = [self._q.get()]
+            while len(batch) < 1000:
+                try: batch.append(self._q.get_nowait())
+                except queue.Empty: break
+            stop = None in batch
+            try:
+                text = self._format(batch)
+                if f is None: f = self._open()
+                f.write(text)
+                f.flush()
+                if f.tell() >= self.max_bytes:
+                    f.close(); f = None
+                    self._rotate()
+            except OSError:
+                self.dropped += len(batch)
+                f = None
+            finally:
+                for _ in batch: self._q.task_done()
+            if stop:
+                if f is not None: f.close()
+                return
+
+    def _format(self, batch):
+        # A record that can't be formatted is dropped on its own; it must
+        # not take the writer thread (and every later flush()) down with it.
+        lines = []
+        for r in batch:
+            if r is None: continue
+            ts, m, kw = r
+            try:
+                lines.append(json.dumps(make_record(m, ts=ts, **kw), ensure_ascii=False, default=str) + "\n")
+            except Exception:
+                self.dropped += 1
+        return "".join(lines)
+
+    def _rotate(self):
+        import gzip
+        base = str(self.path)
+        try:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{base}.{i}.gz"
+                if os.path.exists(src): os.replace(src, f"{base}.{i + 1}.gz")
+            with open(base, "rb") as src, gzip.open(f"{base}.1.gz", "wb") as dst:
+                dst.write(src.read())
+            open(base, "w").close()
+        except OSError:
+            pass  # another process holds the file; try again next batch
+
+# ---------------------------
+# Readers
+# ---------------------------
+def tail(path, n=50, block=8192):
+    """Last `n` records, reading the live log backwards from the end.
+
+    Falls back to the newest archive when the live file was just rotated.
+    """
+    data = b""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, io.SEEK_END)
+            pos = f.tell()
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(block, pos); pos -= step
+                f.seek(pos); data = f.read(step) + data
+    except OSError:
+        pass
+    if data.count(b"\n") < n:
+        import gzip
+        try:
+            with gzip.open(f"{path}.1.gz", "rb") as f:
+                data = f.read() + data
+        except OSError:
+            pass
+    records = []
+    for line in data.splitlines()[-n:]:
+        try: records.append(json.loads(line))
+        except ValueError: records.append({"msg": line.decode("utf-8", "replace")})
+    return records
+
+def recent_runs(path, runs=1, max_records=5000):
+    """Records belonging to the last `runs` runs (a run starts at phase "start")."""
+    records = tail(path, max_records)
+    starts = [i for i, r in enumerate(records) if r.get("phase") == "start"]
+    if not starts:
+        return records
+    return records[starts[-min(runs, len(starts))]:]
@@ -0,0 +1,131 @@
+import os, threading
+
+# ---------------------------
+# Metrics
+# ---------------------------
+# Counters, gauges and fixed-bucket histograms rendered in the Prometheus
+# text format. Everything is a no-op while `enabled` is False, so the
+# subprocess hot path only pays one attribute check. The enforce run
+# writes PROGRAM_DATA/bloatguard.prom; the resident agent can also serve
+# it over a local HTTP endpoint (serve()).
+
+METRICS_NAME = "bloatguard.prom"
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (0, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HELP = {
+    "bloatguard_spawns_total": ("counter", "Processes started through run() and PowerShell host (re)starts, by executable."),
+    "bloatguard_calls_total": ("counter", "Subprocess calls and PowerShell host round trips, by executable."),
+    "bloatguard_failures_total": ("counter", "Calls or commands that returned a non-zero exit code."),
+    "bloatguard_timeouts_total": ("counter", "Calls that hit their timeout."),
+    "bloatguard_call_seconds": ("histogram", "Wall time of each subprocess call or host round trip."),
+    "bloatguard_output_bytes": ("histogram", "stdout+stderr size of each call."),
+    "bloatguard_task_seconds": ("histogram", "Duration of enforce tasks (snapshot/detect/remove/act) by item."),
+    "bloatguard_task_failures_total": ("counter", "Enforce tasks that raised or reported failure."),
+    "bloatguard_items_skipped_total": ("counter", "Items skipped because the state cache said unchanged."),
+    "bloatguard_runs_total": ("counter", "Enforce runs, by source."),
+    "bloatguard_last_run_timestamp_seconds": ("gauge", "Unix time the last enforce run finished."),
+    "bloatguard_last_run_seconds": ("gauge", "Wall time of the last enforce run."),
+}
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _num(v):
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._values = {}  # (name, frozen labels) -> float
+        self._hists = {}   # (name, frozen labels) -> [buckets, cumulative counts, sum, count]
+
+    def inc(self, name, labels=None, value=1):
+        if not self.enabled: return
+        k = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._values[k] = self._values.get(k, 0) + value
+
+    def set(self, name, value, labels=None):
+        if not self.enabled: return
+        with self._lock:
+            self._values[(name, tuple(sorted((labels or {}).items())))] = value
+
+    def observe(self, name, value, labels=None, buckets=SECONDS_BUCKETS):
+        if not self.enabled: return
+        with self._lock:
+            self._observe((name, tuple(sorted((labels or {}).items()))), value, buckets)
+
+    def _observe(self, k, value, buckets):
+        h = self._hists.get(k)
+        if h is None:
+            h = self._hists[k] = [buckets, [0] * len(buckets), 0.0, 0]
+        counts = h[1]
+        for i in range(len(buckets) - 1, -1, -1):  # cumulative: every bucket >= value
+            if value > buckets[i]: break
+            counts[i] += 1
+        h[2] += value; h[3] += 1
+
+    def record(self, exe, seconds, rc, nbytes, spawned=False, timed_out=False):
+        if not self.enabled: return
+        lk = (("exe", exe),)  # one lock round for the whole call record
+        with self._lock:
+            v = self._values
+            for name, hit in (("bloatguard_spawns_total", spawned), ("bloatguard_calls_total", True),
+                              ("bloatguard_failures_total", rc != 0), ("bloatguard_timeouts_total", timed_out)):
+                if hit: v[name, lk] = v.get((name, lk), 0) + 1
+            self._observe(("bloatguard_call_seconds", lk), seconds, SECONDS_BUCKETS)
+            self._observe(("bloatguard_output_bytes", lk), nbytes, BYTES_BUCKETS)
+
+    def render(self):
+        with self._lock:
+            values, hists = dict(self._values), {k: (h[0], list(h[1]), h[2], h[3]) for k, h in self._hists.items()}
+        names = sorted({n for n, _ in values} | {n for n, _ in hists})
+        lines = []
+        for name in names:
+            kind, text = HELP.get(name, ("untyped", name))
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+            for (n, labels), v in sorted(values.items()):
+                if n == name: lines.append(f"{name}{_labels(dict(labels))} {_num(v)}")
+            for (n, labels), (buckets, counts, total, count) in sorted(hists.items()):
+                if n != name: continue
+                for b, c in zip(buckets, counts):
+                    lines.append(f"{name}_bucket{_labels({**dict(labels), 'le': _num(b)})} {c}")
+                lines.append(f"{name}_bucket{_labels({**dict(labels), 'le': '+Inf'})} {count}")
+                lines.append(f"{name}_sum{_labels(dict(labels))} {_num(total)}")
+                lines.append(f"{name}_count{_labels(dict(labels))} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically replace `path` (node_exporter textfile collector style)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+def serve(metrics, port, host="127.0.0.1"):
+    """Serve GET /metrics on a daemon thread; returns the server (call shutdown() to stop)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404); return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="bg-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,175 @@
+import json, argparse, statistics
+import bloatguard_core as core
+from bloatguard_batch import WINGET_FLAGS, removals_for, appx_remove
+from bloatguard_inventory import SnapshotError
+from bloatguard_state import StateCache, Fingerprinter, split_unchanged
+from bloatguard_log import recent_runs
+
+# ---------------------------
+# Dry-run planner
+# ---------------------------
+# Turns a config plus the current inventory and registry into the list of
+# steps enforce() would take: item, backend, the exact commands, and an
+# estimated duration. Items that need nothing (not installed, policy
+# already set, unchanged since the last successful run) are dropped.
+# Estimates come from the act/remove timings previous runs wrote to the
+# log, falling back to per-backend defaults.
+
+HISTORY_RUNS = 20  # enforce runs read back from the log
+HISTORY_SAMPLES = 10  # newest per-item samples the median is taken over
+DEFAULT_MS = {"winget": 45000, "appx": 4000, "policy": 100}  # per package / per policy item
+EXPLORER_RESTART_MS = 3000
+EXPLORER_CMD = "Get-Process explorer | Stop-Process -Force"
+BLOCKED = ("winget not available", "detection failed")  # reasons an item can't run, as opposed to needing nothing
+UNREADABLE = object()
+
+class History:
+    """Per-item durations of past removals, from enforce log records.
+
+    A batched run logs one remove:<backend> record for all its items, so
+    its time is shared evenly between the items that acted in that run.
+    """
+
+    def __init__(self, records=(), backends=None):
+        self.samples = {}  # item -> [ms], oldest first
+        backends = backends or {}
+        acted, removes = {}, {}
+        def close_run():
+            for key, ms in acted.items():
+                peers = [k for k in acted if backends.get(k) == backends.get(key)]
+                share = removes.get(backends.get(key), 0.0) / max(1, len(peers))
+                self.samples.setdefault(key, []).append(ms + share)
+            acted.clear(); removes.clear()
+        for r in records:
+            phase, item, ms = r.get("phase"), r.get("item"), r.get("duration_ms")
+            if phase == "start":
+                close_run()
+            elif ms is not None and item and phase == "act":
+                acted[item] = ms
+            elif ms is not None and item and phase == "remove":
+                removes[item] = ms  # item is the backend name here
+        close_run()
+
+    @classmethod
+    def from_log(cls, path=None, runs=HISTORY_RUNS):
+        return cls(recent_runs(path or core.LOG_PATH, runs),
+                   {it.key: it.removal for it in core.catalog()})
+
+    def estimate(self, key, backend, units=1):
+        """(ms, basis) for one item; `units` packages (or 1 for policy items) when there is no history."""
+        s = self.samples.get(key, [])[-HISTORY_SAMPLES:]
+        if s:
+            return statistics.median(s), f"median of {len(s)} run{'s' if len(s) > 1 else ''}"
+        return DEFAULT_MS[backend] * max(1, units), "default"
+
+class Step:
+    __slots__ = ("item", "label", "backend", "commands", "est_ms", "basis")
+
+    def __init__(self, item, label, backend, commands, est_ms, basis):
+        self.item, self.label, self.backend, self.commands = item, label, backend, commands
+        self.est_ms, self.basis = est_ms, basis
+
+    def __repr__(self):
+        return f"Step({self.item!r}, {self.backend!r}, {len(self.commands)} commands, ~{self.est_ms:.0f} ms)"
+
+def fmt_ms(ms):
+    s = round(ms / 1000)
+    return f"{s // 60}m {s % 60:02d}s" if s >= 60 else f"{ms / 1000:.1f}s" if ms < 10000 else f"{s}s"
+
+class Plan:
+    def __init__(self, steps, skipped, blocked=None, batched=True):
+        self.steps, self.batched = steps, batched
+        self.skipped, self.blocked = skipped, blocked or {}  # {item: reason}
+
+    @property
+    def total_ms(self):
+        return sum(s.est_ms for s in self.steps)
+
+    def keys(self):
+        return [s.item for s in self.steps]
+
+    def render(self):
+        if not self.steps:
+            lines = ["Nothing to do."]
+        else:
+            lines = [f"{len(self.steps)} step{'s' if len(self.steps) > 1 else ''}, estimated ~{fmt_ms(self.total_ms)}"]
+            for n, s in enumerate(self.steps, 1):
+                lines.append(f"{n}. {s.label} [{s.backend}] ~{fmt_ms(s.est_ms)} ({s.basis})")
+                lines += [f"     {c}" for c in s.commands]
+            if self.batched and sum(s.backend in ("winget", "appx") for s in self.steps) > 1:
+                lines.append("Removals run as one script per backend.")
+        if self.skipped:
+            lines.append("Already satisfied: " + ", ".join(f"{k} ({why})" for k, why in self.skipped.items()))
+        if self.blocked:
+            lines.append("Cannot run: " + ", ".join(f"{k} ({why})" for k, why in self.blocked.items()))
+        return "\n".join(lines)
+
+    def as_dict(self):
+        return {"total_ms": round(self.total_ms, 1), "batched": self.batched, "skipped": self.skipped, "blocked": self.blocked,
+                "steps": [{"item": s.item, "label": s.label, "backend": s.backend, "commands": s.commands,
+                           "est_ms": round(s.est_ms, 1), "basis": s.basis} for s in self.steps]}
+
+def _removal_commands(removals):
+    return [f"winget uninstall --id {r.target} {WINGET_FLAGS}" if r.backend == "winget"
+            else f"{appx_remove(core.inventory.appx_all_users)} -Package {r.target}" for r in removals]
+
+def _policy_changes(item):
+    from bloatguard_registry import diff
+    try:
+        return diff(core.registry(), item.registry)
+    except (ImportError, OSError):
+        return [(e, UNREADABLE) for e in item.registry]  # no registry here: assume every value needs writing
+
+def plan_item(item, history, restart_explorer=True):
+    """The Step for one catalogue item, or the reason it needs none."""
+    if item.removal == "policy":
+        changes = _policy_changes(item)
+        if not changes:
+            return "already set"
+        ms, basis = history.estimate(item.key, "policy")
+        cmds = [f"set {e['path']}\\{e['name']} = {e['value']!r} (now {'unknown' if cur is UNREADABLE else repr(cur)})"
+                for e, cur in changes]
+        if restart_explorer and item.key == "copilot_disable" and any(e["name"] == "ShowCopilotButton" for e, _ in changes):
+            cmds.append(EXPLORER_CMD)
+            if basis == "default": ms += EXPLORER_RESTART_MS
+        return Step(item.key, item.label, "policy", cmds, ms, basis)
+    if item.removal == "winget" and not core.winget_available():
+        return "winget not available"
+    try:
+        removals = removals_for(item.key, core.matches(item.key))
+    except SnapshotError as e:
+        return f"detection failed: {e}"
+    if not removals:
+        return "not installed"
+    ms, basis = history.estimate(item.key, item.removal, len(removals))
+    return Step(item.key, item.label, item.removal, _removal_commands(removals), ms, basis)
+
+def build_plan(cfg, force=False, history=None, fingerprinter=None, state=None, restart_explorer=True):
+    """Plan enforce() for `cfg` without changing anything.
+
+    Items unchanged since a successful run are dropped as enforce() would
+    skip them (unless `force`); only the remaining items take snapshots.
+    """
+    cat = core.catalog()
+    keys = [it.key for it in cat if cfg.get(it.key)]
+    history = history or History.from_log()
+    cache = state or StateCache(core.STATE_PATH)
+    todo, unchanged = split_unchanged(keys, cache, fingerprinter or Fingerprinter(sources=core.item_sources()), force)
+    steps, skipped, blocked = [], {k: "unchanged since last run" for k in unchanged}, {}
+    for key in todo:
+        res = plan_item(cat[key], history, restart_explorer)
+        if isinstance(res, Step): steps.append(res)
+        else: (blocked if res.startswith(BLOCKED) else skipped)[key] = res
+    return Plan(steps, skipped, blocked, bool(cfg.get("batch_uninstall", True)))
+
+def main(argv=None):
+    """bloatguard --plan [--config PATH|-] [--force] [--json]"""
+    ap = argparse.ArgumentParser(prog="bloatguard --plan")
+    ap.add_argument("--plan", action="store_true", required=True)
+    ap.add_argument("--config", help="config JSON (default: this machine's; '-' for stdin)")
+    ap.add_argument("--force", action="store_true", help="ignore the state cache, as --enforce --force does")
+    ap.add_argument("--json", action="store_true")
+    args, _ = ap.parse_known_args(argv)
+    plan = build_plan(core.load_config(args.config), force=args.force)
+    print(json.dumps(plan.as_dict(), indent=2) if args.json else plan.render())
+    return 0
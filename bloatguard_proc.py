@@ -0,0 +1,119 @@
+import os, time, signal, locale, threading, subprocess
+
+# ---------------------------
+# Streaming subprocess runner
+# ---------------------------
+# Reads stdout/stderr incrementally on reader threads as raw bytes and
+# decodes once at the end. Retained output is capped (the rest is counted
+# and dropped), a hard timeout kills the whole process tree, and an
+# optional `until(line)` predicate stops the process as soon as a line
+# matches (e.g. a detector that has already seen its package).
+
+DEFAULT_TIMEOUT = 900
+MAX_OUTPUT = 8 * 1024 * 1024  # bytes kept per stream; winget list is well under 1 MiB
+TIMEOUT_RC = 124  # as coreutils timeout(1)
+
+class ProcResult:
+    """Unpacks as (rc, out, err) like the old run(); also says how the run ended."""
+    __slots__ = ("rc", "out", "err", "timed_out", "stopped_early", "truncated", "nbytes")
+
+    def __init__(self, rc, out, err, timed_out=False, stopped_early=False, truncated=False, nbytes=0):
+        self.rc, self.out, self.err = rc, out, err
+        self.timed_out, self.stopped_early, self.truncated, self.nbytes = timed_out, stopped_early, truncated, nbytes
+
+    def __iter__(self):
+        return iter((self.rc, self.out, self.err))
+
+    def __repr__(self):
+        return f"ProcResult(rc={self.rc}, out={len(self.out)} chars, timed_out={self.timed_out}, stopped_early={self.stopped_early})"
+
+class _Capture:
+    """Capped byte buffer fed by a reader thread; optionally feeds complete lines to `until`."""
+
+    def __init__(self, stream, limit, until=None, encoding="utf-8", on_done=None):
+        self.chunks, self.kept, self.total = [], 0, 0
+        self.limit, self.until, self.encoding, self.on_done = limit, until, encoding, on_done
+        self.matched = False
+        self._partial = b""
+        self.thread = threading.Thread(target=self._read, args=(stream,), name="proc-reader", daemon=True)
+        self.thread.start()
+
+    def _read(self, stream):
+        read = getattr(stream, "read1", stream.read)
+        try:
+            while True:
+                chunk = read(65536)
+                if not chunk:
+                    break
+                self.total += len(chunk)
+                if self.kept < self.limit:
+                    keep = chunk[:self.limit - self.kept]
+                    self.chunks.append(keep); self.kept += len(keep)
+                if self.until is not None and not self.matched and self._scan(chunk):
+                    self.matched = True
+                    break
+        except (OSError, ValueError):
+            pass  # pipe closed under us by a kill
+        if self.on_done: self.on_done()  # EOF or match
+
+    def _scan(self, chunk):
+        # Only complete lines are decoded, and only while a predicate is set.
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        return any(self.until(line.decode(self.encoding, "replace").rstrip("\r")) for line in lines)
+
+    def text(self):
+        return b"".join(self.chunks).decode(self.encoding, "replace").strip()
+
+def kill_tree(proc):
+    """Kill `proc` and everything it started."""
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True,
+                           creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0), timeout=30)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+def stream(cmd, shell=False, timeout=DEFAULT_TIMEOUT, until=None, max_output=MAX_OUTPUT, creationflags=0, encoding=None):
+    """Run `cmd` and return a ProcResult.
+
+    `until(line)` is called with each decoded stdout line; the first True
+    stops the process tree and the result has rc 0 and stopped_early set.
+    A timeout kills the tree and returns rc TIMEOUT_RC.
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+    kw = {"creationflags": creationflags} if os.name == "nt" else {"start_new_session": True}
+    try:
+        proc = subprocess.Popen(cmd, shell=shell, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, bufsize=0, **kw)
+    except (OSError, ValueError) as e:
+        return ProcResult(1, "", str(e))
+    done = threading.Event()
+    out = _Capture(proc.stdout, max_output, until, encoding, on_done=done.set)
+    err = _Capture(proc.stderr, max_output, encoding=encoding)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    timed_out = not done.wait(timeout)
+    if not timed_out and not out.matched:
+        try:  # stdout closed; the process should be exiting
+            proc.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            timed_out = True
+    if proc.poll() is None:
+        kill_tree(proc)
+    proc.wait()
+    for c in (out, err):
+        c.thread.join(5)
+    rc = TIMEOUT_RC if timed_out else 0 if out.matched else proc.returncode
+    errtext = err.text()
+    if timed_out:
+        errtext = (errtext + f"\nTimed out after {timeout}s; process tree killed.").strip()
+    return ProcResult(rc, out.text(), errtext, timed_out=timed_out, stopped_early=out.matched,
+                      truncated=out.total > out.kept or err.total > err.kept, nbytes=out.total + err.total)
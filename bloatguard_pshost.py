@@ -0,0 +1,183 @@
+import os, sys, json, base64, queue, subprocess, threading, atexit, itertools
+from bloatguard_proc import kill_tree
+
+# ---------------------------
+# Persistent PowerShell host
+# ---------------------------
+# One long-lived powershell.exe serves every run_ps() call. Requests and
+# responses are single framed lines on stdin/stdout:
+#   -> {"id": n, "cmds": [<base64 utf-8 command>, ...]}
+#   <- ##BGPS {"id": n, "results": [{"rc": int, "out": str, "err": str}, ...]}
+# Anything else the host prints is ignored.
+
+FRAME = "##BGPS "
+DEFAULT_TIMEOUT = 600
+
+HOST_SCRIPT = r"""
+$ErrorActionPreference = 'Continue'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+while ($true) {
+  $line = [Console]::In.ReadLine()
+  if ($line -eq $null) { break }
+  $req = $line | ConvertFrom-Json
+  $results = @()
+  foreach ($b64 in $req.cmds) {
+    $cmd = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($b64))
+    $global:LASTEXITCODE = 0
+    $ok = $true; $out = @(); $err = @()
+    try {
+      $items = & ([ScriptBlock]::Create($cmd)) *>&1
+      if (-not $?) { $ok = $false }
+      foreach ($i in $items) {
+        if ($i -is [System.Management.Automation.ErrorRecord]) { $err += $i.ToString(); $ok = $false } else { $out += $i }
+      }
+    } catch { $err += $_.ToString(); $ok = $false }
+    $rc = if ($LASTEXITCODE) { $LASTEXITCODE } elseif ($ok) { 0 } else { 1 }
+    $results += @{ rc = $rc; out = ($out | Out-String).Trim(); err = ($err -join "`n").Trim() }
+  }
+  $resp = @{ id = $req.id; results = @($results) } | ConvertTo-Json -Compress -Depth 4
+  [Console]::Out.WriteLine('##BGPS ' + $resp)
+  [Console]::Out.Flush()
+}
+"""
+
+# Stand-in host speaking the same framing; runs each command through the
+# platform shell. Used to exercise the protocol where PowerShell is absent.
+STANDIN_SCRIPT = r"""
+import sys, json, base64, subprocess
+for line in sys.stdin:
+    req = json.loads(line)
+    results = []
+    for b64 in req["cmds"]:
+        cmd = base64.b64decode(b64).decode("utf-8")
+        p = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        results.append({"rc": p.returncode, "out": p.stdout.strip(), "err": p.stderr.strip()})
+    print("##BGPS " + json.dumps({"id": req["id"], "results": results}), flush=True)
+"""
+
+def powershell_argv():
+    encoded = base64.b64encode(HOST_SCRIPT.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+def standin_argv():
+    return [sys.executable, "-u", "-c", STANDIN_SCRIPT]
+
+class PSHost:
+    """Framed request/response client for a resident PowerShell process.
+
+    Commands are serialised under a lock. A host that exits or misses its
+    deadline is killed and transparently restarted on the next request;
+    the in-flight commands are reported as failed rather than retried,
+    since they may have had side effects.
+    """
+
+    def __init__(self, argv=None, timeout=DEFAULT_TIMEOUT, creationflags=0, on_spawn=None):
+        self.argv = argv or powershell_argv()
+        self.timeout = timeout
+        self.creationflags = creationflags
+        self.on_spawn = on_spawn  # called after each host process starts
+        self.restarts = 0
+        self._spawned = False
+        self._proc = None
+        self._q = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _start(self):
+        if self._spawned:
+            self.restarts += 1
+        self._spawned = True
+        kw = {"creationflags": self.creationflags} if os.name == "nt" else {"start_new_session": True}
+        self._proc = subprocess.Popen(
+            self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace", bufsize=1, **kw)
+        self._q = q = queue.Queue()
+        out = self._proc.stdout
+        def reader():
+            for line in out:
+                if line.startswith(FRAME):
+                    try:
+                        q.put(json.loads(line[len(FRAME):]))
+                    except ValueError:
+                        pass
+            q.put(None)
+        threading.Thread(target=reader, name="pshost-reader", daemon=True).start()
+        if self.on_spawn: self.on_spawn()
+
+    def _kill(self):
+        p, self._proc = self._proc, None
+        if p is None:
+            return
+        kill_tree(p)  # a timed-out command's children (winget, msiexec) go too
+        try:
+            p.wait(5)
+        except Exception:
+            pass
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def run_batch(self, cmds, timeout=None):
+        """Run several commands in one round trip; return [(rc, stdout, stderr), ...]."""
+        cmds = list(cmds)
+        if not cmds:
+            return []
+        with self._lock:
+            if not self.alive():
+                self._kill()
+                try:
+                    self._start()
+                except Exception as e:
+                    self._proc = None
+                    return [(1, "", str(e))] * len(cmds)
+            req_id = next(self._ids)
+            payload = {"id": req_id, "cmds": [base64.b64encode(c.encode("utf-8")).decode("ascii") for c in cmds]}
+            try:
+                self._proc.stdin.write(json.dumps(payload) + "\n"); self._proc.stdin.flush()
+            except Exception as e:
+                self._kill()
+                return [(1, "", f"PowerShell host write failed: {e}")] * len(cmds)
+            limit = self.timeout if timeout is None else timeout
+            while True:
+                try:
+                    resp = self._q.get(timeout=limit)
+                except queue.Empty:
+                    self._kill()
+                    return [(1, "", f"PowerShell host timed out after {limit}s")] * len(cmds)
+                if resp is None:
+                    self._kill()
+                    return [(1, "", "PowerShell host exited")] * len(cmds)
+                if resp.get("id") == req_id:
+                    break
+            results = resp.get("results") or []
+            if isinstance(results, dict):
+                results = [results]
+            out = [(int(r.get("rc", 1)), (r.get("out") or "").strip(), (r.get("err") or "").strip()) for r in results]
+            out += [(1, "", "no result from PowerShell host")] * (len(cmds) - len(out))
+            return out
+
+    def run(self, cmd, timeout=None):
+        return self.run_batch([cmd], timeout)[0]
+
+    def close(self):
+        with self._lock:
+            p = self._proc
+            if p is not None:
+                try:
+                    p.stdin.close(); p.wait(2)
+                except Exception:
+                    pass
+            self._kill()
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_host(creationflags=0, on_spawn=None):
+    """Process-wide host, closed at interpreter exit; arguments apply when it is first created."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PSHost(creationflags=creationflags, on_spawn=on_spawn)
+            atexit.register(_shared.close)
+        return _shared
@@ -0,0 +1,101 @@
+# ---------------------------
+# Registry backends
+# ---------------------------
+# Policy items are applied in-process: read the current values, write only
+# the ones that differ, and report what changed so callers can skip side
+# effects (explorer restart) when nothing did. Keys use the catalogue's
+# "HKLM\\SOFTWARE\\..." form. FakeRegistry backs tests and benchmarks.
+
+HIVES = ("HKLM", "HKCU")
+
+def _split(key):
+    hive, _, sub = key.partition("\\")
+    if hive.upper() not in HIVES:
+        raise ValueError(f"unsupported hive in {key!r}")
+    return hive.upper(), sub
+
+class WinRegistry:
+    """winreg backend; always uses the 64-bit view so policies land where Windows reads them."""
+
+    def __init__(self):
+        import winreg
+        self.w = winreg
+        self.roots = {"HKLM": winreg.HKEY_LOCAL_MACHINE, "HKCU": winreg.HKEY_CURRENT_USER}
+
+    def get(self, key, name):
+        """Current value, or None when the key or value is missing."""
+        hive, sub = _split(key)
+        try:
+            with self.w.OpenKey(self.roots[hive], sub, 0, self.w.KEY_READ | self.w.KEY_WOW64_64KEY) as h:
+                return self.w.QueryValueEx(h, name)[0]
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, name, value):
+        hive, sub = _split(key)
+        kind = self.w.REG_DWORD if isinstance(value, int) else self.w.REG_SZ
+        with self.w.CreateKeyEx(self.roots[hive], sub, 0, self.w.KEY_SET_VALUE | self.w.KEY_WOW64_64KEY) as h:
+            self.w.SetValueEx(h, name, 0, kind, value)
+
+    def delete(self, key, name):
+        hive, sub = _split(key)
+        try:
+            with self.w.OpenKey(self.roots[hive], sub, 0, self.w.KEY_SET_VALUE | self.w.KEY_WOW64_64KEY) as h:
+                self.w.DeleteValue(h, name)
+        except FileNotFoundError:
+            pass
+
+class FakeRegistry:
+    """In-memory registry with the WinRegistry interface; counts writes."""
+
+    def __init__(self, values=None, fail_on=()):
+        self.values = {self._k(key, name): v for (key, name), v in (values or {}).items()}
+        self.writes = 0
+        self.fail_on = {n.lower() for n in fail_on}  # value names whose write raises
+
+    @staticmethod
+    def _k(key, name):
+        hive, sub = _split(key)
+        return f"{hive}\\{sub}".lower(), name.lower()
+
+    def get(self, key, name):
+        return self.values.get(self._k(key, name))
+
+    def set(self, key, name, value):
+        if name.lower() in self.fail_on:
+            raise PermissionError(f"access denied: {key}\\{name}")
+        self.values[self._k(key, name)] = value
+        self.writes += 1
+
+    def delete(self, key, name):
+        self.values.pop(self._k(key, name), None)
+
+def diff(backend, entries):
+    """[(entry, current)] for policy entries whose current value differs."""
+    out = []
+    for e in entries:
+        current = backend.get(e["path"], e["name"])
+        if current != e["value"]:
+            out.append((e, current))
+    return out
+
+def apply_policy(backend, entries):
+    """Write the differing values as one all-or-nothing batch; return the changed entries.
+
+    If any write fails, values already written are restored (or deleted if
+    they did not exist) before the error is re-raised.
+    """
+    done = []
+    try:
+        for e, old in diff(backend, entries):
+            backend.set(e["path"], e["name"], e["value"])
+            done.append((e, old))
+    except OSError:
+        for e, old in reversed(done):
+            try:
+                if old is None: backend.delete(e["path"], e["name"])
+                else: backend.set(e["path"], e["name"], old)
+            except OSError:
+                pass
+        raise
+    return [e for e, _ in done]
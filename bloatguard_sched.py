@@ -0,0 +1,135 @@
+import time, queue
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------
+# Task scheduler
+# ---------------------------
+# Items are modelled as small graphs of tasks (snapshot -> detect -> act).
+# A task starts once its dependencies have finished and the named resource
+# locks it declares are free (e.g. "winget" is single-writer). Everything
+# else runs concurrently on a bounded pool, so a run costs roughly its
+# slowest chain rather than the sum of all items.
+
+class Task:
+    """One schedulable unit.
+
+    `fn` is called with the values of `deps` as positional arguments.
+    `after` only orders the task: it waits for those tasks to finish,
+    whatever their outcome. A task whose `deps` failed is not run and is
+    reported as skipped.
+    """
+    __slots__ = ("name", "fn", "deps", "after", "locks")
+
+    def __init__(self, name, fn, deps=(), after=(), locks=()):
+        self.name, self.fn = name, fn
+        self.deps, self.after, self.locks = tuple(deps), tuple(after), frozenset(locks)
+
+class Result:
+    __slots__ = ("name", "ok", "value", "error", "started", "duration_ms", "skipped")
+
+    def __init__(self, name, ok, value=None, error="", started=0.0, duration_ms=0.0, skipped=False):
+        self.name, self.ok, self.value, self.error = name, ok, value, error
+        self.started, self.duration_ms, self.skipped = started, duration_ms, skipped
+
+    def as_dict(self):
+        return {"name": self.name, "ok": self.ok, "error": self.error, "skipped": self.skipped,
+                "started": round(self.started, 6), "duration_ms": round(self.duration_ms, 3)}
+
+    def __repr__(self):
+        state = "skipped" if self.skipped else ("ok" if self.ok else "err")
+        return f"Result({self.name!r}, {state}, {self.duration_ms:.1f}ms)"
+
+def _check_graph(tasks):
+    names = {t.name for t in tasks}
+    if len(names) != len(tasks):
+        raise ValueError("duplicate task names")
+    for t in tasks:
+        missing = [d for d in t.deps + t.after if d not in names]
+        if missing:
+            raise ValueError(f"task {t.name!r} depends on unknown {missing}")
+    # Kahn's algorithm: anything left over is on a cycle.
+    indeg = {t.name: len(set(t.deps + t.after)) for t in tasks}
+    users = {n: [] for n in names}
+    for t in tasks:
+        for d in set(t.deps + t.after):
+            users[d].append(t.name)
+    ready = [n for n, k in indeg.items() if k == 0]
+    seen = 0
+    while ready:
+        n = ready.pop(); seen += 1
+        for u in users[n]:
+            indeg[u] -= 1
+            if indeg[u] == 0:
+                ready.append(u)
+    if seen != len(tasks):
+        raise ValueError("task graph has a cycle")
+
+class Scheduler:
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+
+    def run(self, tasks, on_event=None, cancel=None):
+        """Run `tasks` respecting deps and locks; return {name: Result} in task order.
+
+        `on_event(kind, name, result)` is called from the scheduling thread
+        with kind "start" (result None) or "done". Once the `cancel` event is
+        set, tasks that have not started are reported as skipped.
+        """
+        tasks = list(tasks)
+        notify = on_event or (lambda kind, name, result: None)
+        _check_graph(tasks)
+        results, held = {}, set()
+        pending = list(tasks)
+        done_q = queue.Queue()
+        running = 0
+        t0 = time.perf_counter()
+
+        def invoke(task, args):
+            start = time.perf_counter()
+            try:
+                value = task.fn(*args)
+                res = Result(task.name, True, value)
+            except Exception as e:
+                res = Result(task.name, False, error=f"{type(e).__name__}: {e}")
+            res.started = start - t0
+            res.duration_ms = (time.perf_counter() - start) * 1000
+            done_q.put((task, res))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bg-sched") as pool:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for task in list(pending):
+                        if cancel is not None and cancel.is_set():
+                            pending.remove(task)
+                            results[task.name] = res = Result(task.name, False, error="cancelled",
+                                                              started=time.perf_counter() - t0, skipped=True)
+                            notify("done", task.name, res)
+                            continue
+                        waits = task.deps + task.after
+                        if any(d not in results for d in waits):
+                            continue
+                        failed = [d for d in dict.fromkeys(task.deps) if not results[d].ok]
+                        if failed:
+                            pending.remove(task)
+                            results[task.name] = Result(task.name, False, error=f"dependency failed: {', '.join(failed)}",
+                                                        started=time.perf_counter() - t0, skipped=True)
+                            notify("done", task.name, results[task.name])
+                            progressed = True
+                            continue
+                        if running >= self.max_workers or task.locks & held:
+                            continue
+                        pending.remove(task)
+                        held |= task.locks
+                        running += 1
+                        notify("start", task.name, None)
+                        pool.submit(invoke, task, [results[d].value for d in task.deps])
+                if not running:
+                    break
+                task, res = done_q.get()
+                running -= 1
+                held -= task.locks
+                results[task.name] = res
+                notify("done", task.name, res)
+        return {t.name: results[t.name] for t in tasks}
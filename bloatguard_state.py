@@ -0,0 +1,135 @@
+import os, json, time, hashlib
+from pathlib import Path
+
+# ---------------------------
+# Incremental enforcement state
+# ---------------------------
+# Each enforced item has a cheap fingerprint built from directory mtimes and
+# registry key/value state that changes when the item is (re)installed.
+# If the fingerprint matches the last run and that run succeeded, the item
+# is skipped without spawning winget or PowerShell at all.
+
+STATE_NAME = "bloatguard.state.json"
+DEFAULT_TTL = 7 * 24 * 3600  # re-verify at least weekly even if nothing changed
+
+_ENV = os.environ.get
+PROGRAM_FILES = _ENV("ProgramFiles", r"C:\Program Files")
+PROGRAM_FILES_X86 = _ENV("ProgramFiles(x86)", r"C:\Program Files (x86)")
+WINDOWS_APPS = os.path.join(PROGRAM_FILES, "WindowsApps")
+APP_REPOSITORY = os.path.join(_ENV("PROGRAMDATA", r"C:\ProgramData"), "Microsoft", "Windows", "AppRepository")
+WINGET_STATE = os.path.join(_ENV("LOCALAPPDATA", ""), "Packages", "Microsoft.DesktopAppInstaller_8wekyb3d8bbwe", "LocalState")
+UNINSTALL_KEYS = [
+    r"HKLM\SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
+    r"HKLM\SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall",
+    r"HKCU\Software\Microsoft\Windows\CurrentVersion\Uninstall",
+]
+COPILOT_POLICY_KEY = r"HKLM\SOFTWARE\Policies\Microsoft\Windows\WindowsCopilot"
+EXPLORER_ADVANCED_KEY = r"HKCU\Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced"
+
+# Sources: ("path", dir) -> mtime, ("regkey", key) -> last write time,
+# ("regval", key, name) -> value.
+WINGET_SOURCES = [("path", WINGET_STATE)] + [("regkey", k) for k in UNINSTALL_KEYS]
+APPX_SOURCES = [("path", WINDOWS_APPS), ("path", os.path.join(APP_REPOSITORY, "Packages"))]
+ITEM_SOURCES = {
+    "edge": WINGET_SOURCES + [("path", os.path.join(PROGRAM_FILES_X86, "Microsoft", "Edge", "Application"))],
+    "store": APPX_SOURCES,
+    "office": WINGET_SOURCES + [("path", os.path.join(PROGRAM_FILES, "Microsoft Office"))],
+    "copilot_disable": [("regval", COPILOT_POLICY_KEY, "TurnOffWindowsCopilot"),
+                        ("regval", EXPLORER_ADVANCED_KEY, "ShowCopilotButton")],
+    "copilot_remove_webxp": APPX_SOURCES + [("regval", EXPLORER_ADVANCED_KEY, "ShowCopilotButton")],
+}
+
+def _stat_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _open_key(key):
+    import winreg
+    hive, _, sub = key.partition("\\")
+    root = {"HKLM": winreg.HKEY_LOCAL_MACHINE, "HKCU": winreg.HKEY_CURRENT_USER}[hive.upper()]
+    return winreg.OpenKey(root, sub)
+
+def _reg_key_time(key):
+    try:
+        import winreg
+        with _open_key(key) as h:
+            return winreg.QueryInfoKey(h)[2]
+    except (ImportError, OSError):
+        return None
+
+def _reg_value(key, name):
+    try:
+        import winreg
+        with _open_key(key) as h:
+            return winreg.QueryValueEx(h, name)[0]
+    except (ImportError, OSError):
+        return None
+
+class Fingerprinter:
+    """Hashes the change sources of an item. Readers are injectable for tests."""
+
+    def __init__(self, mtime=_stat_mtime, reg_key_time=_reg_key_time, reg_value=_reg_value, sources=ITEM_SOURCES):
+        self.mtime, self.reg_key_time, self.reg_value = mtime, reg_key_time, reg_value
+        self.sources = sources
+
+    def read(self, source):
+        kind = source[0]
+        if kind == "path": return self.mtime(source[1])
+        if kind == "regkey": return self.reg_key_time(source[1])
+        if kind == "regval": return self.reg_value(source[1], source[2])
+        raise ValueError(f"unknown fingerprint source {kind!r}")
+
+    def fingerprint(self, key):
+        parts = [f"{'|'.join(map(str, src))}={self.read(src)!r}" for src in self.sources.get(key, ())]
+        if not parts:
+            return None  # no cheap signal for this item: always run it
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+class StateCache:
+    """Per-item {fingerprint, ok, at} records persisted as JSON in PROGRAM_DATA."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, clock=time.time):
+        self.path, self.ttl, self.clock = Path(path), ttl, clock
+        self.items = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.items = data.get("items", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            pass
+        self.evict_expired()
+
+    def evict_expired(self):
+        now = self.clock()
+        self.items = {k: v for k, v in self.items.items() if now - v.get("at", 0) < self.ttl}
+
+    def fresh(self, key, fp) -> bool:
+        e = self.items.get(key)
+        return bool(fp and e and e.get("fingerprint") == fp and e.get("ok")
+                    and self.clock() - e.get("at", 0) < self.ttl)
+
+    def record(self, key, fp, ok, duration_ms=None):
+        self.items[key] = {"fingerprint": fp, "ok": bool(ok), "at": self.clock(), "duration_ms": duration_ms}
+
+    def forget(self, key):
+        self.items.pop(key, None)
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": 1, "items": self.items}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def split_unchanged(keys, cache, fingerprinter, force=False):
+    """Partition item keys into (to_run, unchanged) using the cache."""
+    if force:
+        return list(keys), []
+    todo, unchanged = [], []
+    for k in keys:
+        (unchanged if cache.fresh(k, fingerprinter.fingerprint(k)) else todo).append(k)
+    return todo, unchanged
+
+def record_results(cache, fingerprinter, results):
+    """Store post-run fingerprints. `results` maps item key -> (ok, duration_ms)."""
+    for key, (ok, duration_ms) in results.items():
+        cache.record(key, fingerprinter.fingerprint(key), ok, duration_ms)
@@ -0,0 +1,239 @@
+import os, sys, time, struct, asyncio, threading
+
+# ---------------------------
+# Event-driven resident agent core
+# ---------------------------
+# The agent sleeps in an asyncio loop and only wakes for real events:
+# directory change notifications on package install locations, edits to the
+# config file, or the binder hotkey. Bursts of change events are debounced
+# per item before enforcement is re-run for just the affected items. A
+# steady trickle (the agent's own log writes show up as PROGRAM_DATA
+# changes on Windows) can't hold a burst back for longer than MAX_WAIT_S.
+
+DEBOUNCE_S = 5.0
+MAX_WAIT_S = 30.0
+RESUME_GRACE_S = 2.0  # late notifications of a finished run's own writes
+STATS_INTERVAL_S = 3600
+
+class FakeEventSource:
+    """In-memory source; `emit(path)` may be called from any thread."""
+
+    def __init__(self, paths=()):
+        self.paths = list(paths)
+        self._loop = self._notify = None
+
+    def start(self, loop, notify):
+        self._loop, self._notify = loop, notify
+
+    def emit(self, path):
+        self._loop.call_soon_threadsafe(self._notify, path)
+
+    def close(self):
+        self._notify = None
+
+class InotifySource:
+    """Linux inotify watches; the fd is registered with the loop, so no polling."""
+
+    MASK = 0x2 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x4  # modify, close_write, moved_from/to, create, delete, attrib
+    _HDR = struct.Struct("iIII")
+
+    def __init__(self, paths):
+        import ctypes, ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.paths = [p for p in paths if os.path.isdir(p)]
+        self._fd, self._wds, self._loop = -1, {}, None
+
+    def start(self, loop, notify):
+        import ctypes
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        for p in self.paths:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(p), self.MASK)
+            if wd >= 0:
+                self._wds[wd] = p
+        self._loop, self._notify = loop, notify
+        loop.add_reader(self._fd, self._drain)
+
+    def _drain(self):
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        off = 0
+        while off + self._HDR.size <= len(buf):
+            wd, _, _, n = self._HDR.unpack_from(buf, off)
+            name = buf[off + self._HDR.size: off + self._HDR.size + n].rstrip(b"\0")
+            off += self._HDR.size + n
+            base = self._wds.get(wd)
+            if base is not None:
+                self._notify(os.path.join(base, os.fsdecode(name)) if name else base)
+
+    def close(self):
+        if self._fd >= 0:
+            if self._loop is not None:
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd); self._fd = -1
+
+class WinChangeSource:
+    """Windows change notifications; one thread blocks in WaitForMultipleObjects.
+
+    Reports the watched directory itself (the API gives no file names).
+    """
+
+    FLAGS = 0x1 | 0x2 | 0x10  # file name, dir name, last write
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self, paths):
+        import ctypes
+        from ctypes import wintypes
+        self._k32 = k32 = ctypes.windll.kernel32
+        k32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        k32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        k32.CreateEventW.restype = wintypes.HANDLE
+        k32.WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD]
+        self._wintypes, self._ctypes = wintypes, ctypes
+        self.paths = [p for p in paths if os.path.isdir(p)]
+        self._handles, self._stop, self._thread = [], None, None
+
+    def start(self, loop, notify):
+        bad = self._wintypes.HANDLE(-1).value
+        for p in self.paths:
+            h = self._k32.FindFirstChangeNotificationW(p, False, self.FLAGS)
+            if h and h != bad:
+                self._handles.append((h, p))
+        self._stop = self._k32.CreateEventW(None, True, False, None)
+        arr = (self._wintypes.HANDLE * (len(self._handles) + 1))(self._stop, *[h for h, _ in self._handles])
+        def wait():
+            while True:
+                r = self._k32.WaitForMultipleObjects(len(arr), arr, False, self.INFINITE)
+                if r == 0 or r >= len(arr):
+                    return
+                h, p = self._handles[r - 1]
+                loop.call_soon_threadsafe(notify, p)
+                self._k32.FindNextChangeNotification(self._ctypes.c_void_p(h))
+        self._thread = threading.Thread(target=wait, name="bg-watch", daemon=True); self._thread.start()
+
+    def close(self):
+        if self._stop:
+            self._k32.SetEvent(self._ctypes.c_void_p(self._stop))
+            if self._thread: self._thread.join(2)
+        for h, _ in self._handles:
+            self._k32.FindCloseChangeNotification(self._ctypes.c_void_p(h))
+        self._handles = []
+
+def default_source(paths):
+    """Best native source for this platform, or None if none is available."""
+    try:
+        if sys.platform == "win32":
+            return WinChangeSource(paths)
+        if sys.platform.startswith("linux"):
+            return InotifySource(paths)
+    except OSError:
+        pass
+    return None
+
+class LoopStats:
+    """Wakeup and CPU accounting for the resident loop."""
+
+    def __init__(self, clock=time.monotonic, cpu=time.process_time):
+        self.clock, self.cpu = clock, cpu
+        self.wakeups = 0
+        self._t0, self._c0 = clock(), cpu()
+
+    def wake(self):
+        self.wakeups += 1
+
+    def report(self):
+        elapsed = max(self.clock() - self._t0, 1e-9)
+        return {"uptime_s": round(elapsed, 1), "wakeups": self.wakeups,
+                "wakeups_per_min": round(self.wakeups * 60 / elapsed, 3),
+                "cpu_s": round(self.cpu() - self._c0, 3),
+                "cpu_pct": round(100 * (self.cpu() - self._c0) / elapsed, 4)}
+
+class Watcher:
+    """Routes change events to item keys and fires `on_change(keys)` once a burst settles.
+
+    `routes` maps a watched path to the item keys it affects. A burst
+    settles after `debounce` quiet seconds, or `max_wait` after its first
+    event at the latest. `on_change` is awaited on the loop, so
+    long-running work should hand off to an executor itself. Between
+    suspend() and resume() routed events are dropped.
+    """
+
+    def __init__(self, source, routes, on_change, debounce=None, stats=None, max_wait=None):
+        self.source, self.on_change = source, on_change
+        self.debounce = DEBOUNCE_S if debounce is None else debounce
+        self.max_wait = MAX_WAIT_S if max_wait is None else max_wait
+        self.routes = [(os.path.normcase(os.path.normpath(p)), set(keys)) for p, keys in routes.items()]
+        self.stats = stats or LoopStats()
+        self._pending, self._timer, self._loop = set(), None, None
+        self._first = None  # loop time of the pending burst's first event
+        self._suspended, self.dropped = 0, 0
+        self._stopped = None
+
+    def keys_for(self, path):
+        path = os.path.normcase(os.path.normpath(path))
+        hit = set()
+        for base, keys in self.routes:
+            # Directory-level sources (Windows) report the parent of a watched file.
+            if path == base or path.startswith(base + os.sep) or base.startswith(path + os.sep):
+                hit |= keys
+        return hit
+
+    def _on_event(self, path):
+        self.stats.wake()
+        keys = self.keys_for(path)
+        if not keys:
+            return
+        if self._suspended:
+            self.dropped += 1
+            return
+        self._pending |= keys
+        now = self._loop.time()
+        if self._timer is not None:
+            self._timer.cancel()
+        else:
+            self._first = now
+        self._timer = self._loop.call_later(max(0.0, min(self.debounce, self._first + self.max_wait - now)), self._fire)
+
+    def _fire(self):
+        self.stats.wake()
+        keys, self._pending, self._timer, self._first = self._pending, set(), None, None
+        self._loop.create_task(self.on_change(keys))
+
+    def suspend(self):
+        """Drop routed events until resume(), e.g. while the agent's own run touches watched paths."""
+        self._suspended += 1
+
+    def resume(self, grace=None):
+        """Accept events again after `grace` seconds, so late notifications of the run are dropped too."""
+        def done():
+            self._suspended -= 1
+        self._loop.call_later(RESUME_GRACE_S if grace is None else grace, done)
+
+    def call_soon(self, fn, *args):
+        """Thread-safe hook for non-file events such as the hotkey."""
+        def wrapped():
+            self.stats.wake(); fn(*args)
+        self._loop.call_soon_threadsafe(wrapped)
+
+    def stop(self):
+        if self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def run(self, report=None, report_every=STATS_INTERVAL_S):
+        """Start the source and sleep until stop(); `report(stats_dict)` is called periodically."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self.source.start(self._loop, self._on_event)
+        def tick():
+            self.stats.wake(); report(self.stats.report())
+            handle[0] = self._loop.call_later(report_every, tick)
+        handle = [self._loop.call_later(report_every, tick) if report else None]
+        try:
+            await self._stopped.wait()
+        finally:
+            if handle[0] is not None: handle[0].cancel()
+            if self._timer is not None: self._timer.cancel()
+            self.source.close()
@@ -0,0 +1,107 @@
+import time, queue, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from bloatguard_sched import Scheduler
+
+# ---------------------------
+# Background work for the GUI
+# ---------------------------
+# Blocking detectors and uninstallers run on worker threads. Results come
+# back as (kind, key, payload) messages on a thread-safe queue that the Tk
+# main loop drains from an after() callback, so widgets are only touched
+# on the UI thread. Nothing here imports tkinter.
+
+FRAME_BUDGET_MS = 16
+LAG_WINDOW = 3600  # ticks kept for the percentile: about a minute at FRAME_BUDGET_MS
+
+class Worker:
+    def __init__(self, max_workers=4):
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bg-worker")
+
+    def submit(self, key, fn, *args):
+        """Run fn(*args) in the background; posts ("done", key, value) or ("error", key, message)."""
+        def job():
+            try:
+                self.events.put(("done", key, fn(*args)))
+            except Exception as e:
+                self.events.put(("error", key, f"{type(e).__name__}: {e}"))
+        return self._pool.submit(job)
+
+    def run_tasks(self, key, tasks, scheduler=None, finish=None):
+        """Run a task graph in the background, streaming per-task progress.
+
+        Posts ("start", name, None) and ("task", name, Result) as tasks move,
+        then ("done", key, {name: Result}) once the graph completes. Task
+        names can look like submit() keys, so handlers route on the kind
+        first. `finish(results)` runs on the worker before "done" is posted.
+        """
+        self.cancel_event.clear()
+        sched = scheduler or Scheduler()
+        def on_event(kind, name, result):
+            self.events.put(("start" if kind == "start" else "task", name, result))
+        def job():
+            results = sched.run(tasks, on_event=on_event, cancel=self.cancel_event)
+            if finish: finish(results)
+            return results
+        return self.submit(key, job)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def drain(self, handler, budget_ms=FRAME_BUDGET_MS / 2):
+        """Deliver queued messages to handler(kind, key, payload) on the calling thread.
+
+        Stops after `budget_ms` so a burst of results cannot hold up the
+        main loop; the rest are picked up on the next call. Returns the
+        number of messages handled.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        n = 0
+        while True:
+            try:
+                msg = self.events.get_nowait()
+            except queue.Empty:
+                break
+            handler(*msg); n += 1
+            if time.perf_counter() >= deadline:
+                break
+        return n
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+class LoopMonitor:
+    """Measures main-loop stalls from the lateness of a periodic callback.
+
+    Call `tick()` from an after(interval_ms) callback; the difference between
+    the expected and actual firing time is the time the loop was blocked.
+    Only the last `window` lags are kept; the worst one is tracked for the
+    whole session.
+    """
+
+    def __init__(self, interval_ms=FRAME_BUDGET_MS, clock=time.perf_counter, window=LAG_WINDOW):
+        self.interval_ms = interval_ms
+        self.clock = clock
+        self.lags_ms = deque(maxlen=window)
+        self.ticks = 0
+        self.max_lag_ms = 0.0
+        self._last = None
+
+    def tick(self):
+        now = self.clock()
+        if self._last is not None:
+            lag = max(0.0, (now - self._last) * 1000 - self.interval_ms)
+            self.lags_ms.append(lag); self.ticks += 1
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+        self._last = now
+
+    def within(self, budget_ms=FRAME_BUDGET_MS) -> bool:
+        return self.max_lag_ms <= budget_ms
+
+    def summary(self):
+        lags = sorted(self.lags_ms)
+        p95 = lags[int(len(lags) * 0.95)] if lags else 0.0
+        return {"ticks": self.ticks, "max_lag_ms": round(self.max_lag_ms, 2), "p95_lag_ms": round(p95, 2)}
@@ -0,0 +1,6 @@
+import os, sys, tempfile
+
+# bloatguard_core resolves PROGRAM_DATA at import time; keep every test run
+# out of the real ProgramData.
+os.environ.setdefault("PROGRAMDATA", tempfile.mkdtemp(prefix="bg-test-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
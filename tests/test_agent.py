@@ -0,0 +1,26 @@
+import asyncio, threading, time
+import bloatguard_agent as agent
+import bloatguard_watch
+from bloatguard_watch import FakeEventSource
+
+def test_events_from_the_agents_own_run_do_not_retrigger_it(monkeypatch):
+    monkeypatch.setattr(bloatguard_watch, "DEBOUNCE_S", 0.05)
+    monkeypatch.setattr(bloatguard_watch, "RESUME_GRACE_S", 0.1)
+    edge = next(p for p, keys in agent.watch_routes().items() if keys == {"edge"})
+    src, runs = FakeEventSource(), []
+    def failing_run(cfg, force=False):
+        runs.append(sorted(k for k in ("edge", "store") if cfg.get(k)))
+        src.emit(edge)  # the (failed) removal touches the watched folder...
+        threading.Timer(0.02, src.emit, (edge,)).start()  # ...and a notification lands just after it returns
+        time.sleep(0.05)
+    monkeypatch.setattr(agent, "run_enforcement", failing_run)
+    async def main():
+        task = asyncio.create_task(agent.run_resident({"edge": True, "store": True}, source=src))
+        await asyncio.sleep(0.02)
+        src.emit(edge)  # a real change
+        await asyncio.sleep(0.6)
+        watcher = src._notify.__self__
+        watcher.stop(); await task
+        return watcher
+    watcher = asyncio.run(main())
+    assert runs == [["edge"]] and watcher.dropped == 2
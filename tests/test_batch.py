@@ -0,0 +1,21 @@
+from bloatguard_batch import BatchExecutor, Removal, MARK
+
+def answer(calls, name):
+    def run(script, timeout):
+        calls.append((name, script))
+        n = script.splitlines()[0].count("'") // 2
+        return 0, "\n".join(f"{MARK}begin {i}\n{MARK}end {i} 0" for i in range(n)), ""
+    return run
+
+def test_winget_runs_through_its_own_runner_and_appx_keeps_the_user_scope():
+    calls = []
+    out = BatchExecutor(answer(calls, "host"), run_winget=answer(calls, "process")).add(
+        [Removal("edge", "winget", "Microsoft.Edge"), Removal("store", "appx", "Microsoft.WindowsStore_1")]).run()
+    assert [ok for _, ok, _ in out] == [True, True]
+    assert [name for name, _ in calls] == ["process", "host"]
+    assert "Remove-AppxPackage -Package" in calls[1][1]
+
+def test_all_users_is_opt_in():
+    calls = []
+    BatchExecutor(answer(calls, "host"), appx_all_users=True).add([Removal("store", "appx", "Microsoft.WindowsStore_1")]).run()
+    assert "Remove-AppxPackage -AllUsers -Package" in calls[0][1]
@@ -0,0 +1,41 @@
+import json
+from bloatguard_catalog import load_catalog
+from bloatguard_inventory import Package
+
+def load(tmp_path, items):
+    (tmp_path / "bloatguard.catalog.json").write_text(json.dumps({"items": items}), encoding="utf-8")
+    errors = []
+    return load_catalog(tmp_path, on_error=errors.append), errors
+
+def test_unspliceable_patterns_are_rejected_and_the_rest_still_match(tmp_path):
+    cat, errors = load(tmp_path, [
+        {"key": "teams", "winget_names": ["(?i)teams"]},
+        {"key": "echo", "winget_names": [r"^(foo)\1"]},
+        {"key": "named", "winget_names": [r"(?P<x>zoom)"]},
+        {"key": "ok", "winget_names": [r"^vendor (?:tool|app)\b", r"(?i:scoped)"]},
+    ])
+    assert len(errors) == 3 and {it.key for it in cat} >= {"edge", "ok"}
+    hits = cat.compiled().match_winget([Package("Vendor Tool 1", "V.T"), Package("Microsoft Edge", "Microsoft.Edge")])
+    assert set(hits) == {"ok", "edge"}
+
+def test_bad_registry_entries_are_rejected(tmp_path):
+    cat, errors = load(tmp_path, [
+        {"key": "noname", "removal": "policy", "registry": [{"path": r"HKLM\X"}]},
+        {"key": "hive", "removal": "policy", "registry": [{"path": r"HKU\S-1-5-18\X", "name": "A", "value": 1}]},
+        {"key": "novalue", "removal": "policy", "registry": [{"path": r"HKCU\X", "name": "A"}]},
+        {"key": "good", "removal": "policy", "registry": [{"path": r"hkcu\Software\X", "name": "A", "value": "on"}]},
+    ])
+    assert len(errors) == 3
+    assert "good" in {it.key for it in cat} and not {"noname", "hive", "novalue"} & {it.key for it in cat}
+
+def test_match_memo_is_per_inventory(tmp_path):
+    from bloatguard_inventory import Inventory
+    cat, _ = load(tmp_path, [])
+    def inv(listing):
+        return Inventory(lambda cmd, **kw: (0, listing, ""), lambda c: (0, "[]", ""))
+    edge = ("Name            Id              Version  Source\n"
+            "------------------------------------------------\n"
+            "Microsoft Edge  Microsoft.Edge  131.0    winget\n")
+    compiled = cat.compiled()
+    assert compiled.packages(inv(edge), "edge")
+    assert compiled.packages(inv(edge.splitlines()[0] + "\n" + edge.splitlines()[1]), "edge") == []  # same generation, other machine
@@ -0,0 +1,104 @@
+import json
+import pytest
+import bloatguard_core as core
+from bloatguard_inventory import Inventory, SnapshotError
+from bloatguard_registry import FakeRegistry
+from bloatguard_state import Fingerprinter
+
+EDGE_LIST = ("Name            Id              Version  Source\n"
+             "------------------------------------------------\n"
+             "Microsoft Edge  Microsoft.Edge  131.0    winget\n")
+
+class Machine:
+    """Canned run/run_ps seams for bloatguard_core."""
+
+    def __init__(self, winget_rc=0, winget_version_rc=0, appx_rc=0, elevated=True):
+        self.winget_rc, self.winget_version_rc, self.appx_rc = winget_rc, winget_version_rc, appx_rc
+        self.elevated = elevated
+        self.scripts = []
+
+    def run(self, cmd, shell=False, timeout=None, until=None):
+        if cmd[:2] == ["winget", "--version"]:
+            return self.winget_version_rc, "v1.9", ""
+        if cmd[:2] == ["winget", "list"]:
+            return (0, EDGE_LIST, "") if self.winget_rc == 0 else (self.winget_rc, "", "Timed out after 300s")
+        return 1, "", "not simulated"
+
+    def run_ps_batch(self, cmds, timeout=None):
+        out = []
+        for c in cmds:
+            self.scripts.append(c)
+            if "Get-AppxPackage -AllUsers" in c and not self.elevated:
+                out.append((1, "", "Access is denied."))
+            elif "Get-AppxPackage" in c and "ConvertTo-Json" in c:
+                out.append((0, "[]", "") if self.appx_rc == 0 else (self.appx_rc, "", "Access denied"))
+            else:
+                out.append((0, "", ""))
+        return out
+
+@pytest.fixture
+def machine(monkeypatch, tmp_path):
+    def install(**kw):
+        m = Machine(**kw)
+        monkeypatch.setattr(core, "_spawn", m.run)
+        monkeypatch.setattr(core, "_ps_round_trip", m.run_ps_batch)
+        monkeypatch.setattr(core, "_registry", [FakeRegistry()])
+        monkeypatch.setattr(core, "STATE_PATH", tmp_path / "state.json")
+        monkeypatch.setattr(core, "inventory", Inventory(lambda cmd, **kw: core.run(cmd, **kw), lambda c: core.run_ps(c)))
+        return m
+    return install
+
+FP = Fingerprinter(mtime=lambda p: 1, reg_key_time=lambda k: 1, reg_value=lambda k, n: 1)
+
+def test_failed_winget_list_fails_detection_and_is_not_cached(machine):
+    machine(winget_rc=124)
+    res = core.enforce({"edge": True, "metrics": False}, fingerprinter=FP)
+    assert not res["detect:edge"].ok and "winget list failed (rc 124)" in res["detect:edge"].error
+    summary = core.enforce_summary(res)["edge"]
+    assert summary["present"] is None and summary["ok"] is False
+    assert "edge" not in json.loads(core.STATE_PATH.read_text())["items"]
+
+def test_missing_winget_reports_not_available(machine):
+    machine(winget_rc=1, winget_version_rc=1)
+    assert not core.winget_available()
+    with pytest.raises(SnapshotError, match="winget not available"):
+        core.detect_office()
+
+def test_failed_appx_listing_raises_until_invalidated():
+    calls = []
+    def run_ps(cmd):
+        calls.append(cmd); return (1, "", "boom") if len(calls) == 1 else (0, '[{"Name": "A", "PackageFullName": "A_1"}]', "")
+    inv = Inventory(lambda *a, **k: (0, "", ""), run_ps)
+    for _ in range(2):
+        with pytest.raises(SnapshotError):
+            inv.appx_packages()
+    assert len(calls) == 1  # the failure is remembered for the snapshot's lifetime
+    inv.invalidate()
+    assert [p.name for p in inv.appx_packages()] == ["A"]
+
+def test_one_failed_detector_does_not_block_other_items(machine):
+    machine(appx_rc=1)
+    res = core.enforce({"edge": True, "store": True, "metrics": False}, fingerprinter=FP)
+    assert not res["detect:store"].ok
+    assert res["detect:edge"].ok and res["detect:edge"].value is True
+    assert not res["act:edge"].skipped
+
+def test_all_users_appx_listing_falls_back_to_the_current_user(machine):
+    m = machine(elevated=False)
+    res = core.enforce({"store": True, "appx_all_users": True, "metrics": False}, fingerprinter=FP)
+    assert res["detect:store"].ok and res["detect:store"].value is False
+    assert core.inventory.appx_fallback
+    assert [c.split(" |")[0] for c in m.scripts] == ["Get-AppxPackage -AllUsers", "Get-AppxPackage"]
+
+def test_appx_defaults_to_the_current_user(machine):
+    m = machine(elevated=False)
+    assert not core.enforce({"store": True, "metrics": False}, fingerprinter=FP)["detect:store"].value
+    assert [c.split(" |")[0] for c in m.scripts] == ["Get-AppxPackage"] and not core.inventory.appx_fallback
+
+@pytest.mark.parametrize("out", ['WARNING: deployment service busy\n[{"Name": "A"}]', '[{"Name": "A", "Pack', '"text"'])
+def test_unreadable_appx_listing_is_a_snapshot_failure(machine, monkeypatch, out):
+    machine()
+    monkeypatch.setattr(core, "_ps_round_trip", lambda cmds, timeout=None: [(0, out, "")] * len(cmds))
+    res = core.enforce({"store": True, "metrics": False}, fingerprinter=FP)
+    assert not res["detect:store"].ok and "unreadable" in res["detect:store"].error
+    assert "store" not in json.loads(core.STATE_PATH.read_text())["items"]
@@ -0,0 +1,18 @@
+import asyncio, pytest
+from bloatguard_fleet import parse_result, local_transport, run_fleet
+
+@pytest.mark.parametrize("frame", ['[]', '{"items": []}', '{"items": {"edge": true}}', '{"other": 1}'])
+def test_malformed_frames_are_rejected(frame):
+    with pytest.raises(ValueError):
+        parse_result("noise\n##BGRESULT " + frame)
+
+def test_frame_is_found_among_noise():
+    assert parse_result('x\n##BGRESULT {"items": {"edge": {"ok": true}}}\ny') == {"items": {"edge": {"ok": True}}}
+
+def test_local_transport_runs_the_real_enforce_path(tmp_path):
+    cfg = {"copilot_disable": True, "metrics": False}
+    results = asyncio.run(run_fleet(["pc1", "pc2"], cfg, local_transport(str(tmp_path)), timeout=60, retries=0))
+    assert sorted(r["host"] for r in results) == ["pc1", "pc2"]
+    for r in results:
+        assert r["error"] is None and set(r["items"]) == {"copilot_disable"}
+        assert (tmp_path / r["host"] / "BloatGuard" / "bloatguard.log").exists()
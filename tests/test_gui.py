@@ -0,0 +1,42 @@
+import pytest
+pytest.importorskip("tkinter")
+from bloatguard_gui import App
+from bloatguard_sched import Result
+
+class Label:
+    text = None
+    def config(self, text): self.text = text
+
+class Listbox:
+    def __init__(self, n): self.rows = [""] * n
+    def delete(self, i): self.rows.pop(i)
+    def insert(self, i, text): self.rows.insert(i, text)
+
+class FakeApp:
+    on_worker_event, on_apply_event, set_apply_row = App.on_worker_event, App.on_apply_event, App.set_apply_row
+
+    def __init__(self):
+        self.labels = {k: Label() for k in ("edge", "store", "office", "copilot")}
+        self.apply_win = object()
+        self.apply_rows = {"act:edge": "Microsoft Edge", "act:webxp": "WebXP"}
+        self.apply_backends = {"act:edge": "winget", "act:webxp": "appx"}
+        self.apply_list = Listbox(2)
+
+    def status_label(self, key):
+        return self.labels[key]
+
+def test_apply_graph_events_do_not_touch_detection_labels():
+    app = FakeApp()
+    for msg in [("start", "detect:edge", None), ("task", "detect:edge", Result("detect:edge", True, False)),
+                ("start", "detect:webxp", None), ("task", "detect:webxp", Result("detect:webxp", True, True)),
+                ("start", "remove:appx", None), ("task", "act:webxp", Result("act:webxp", True, (True, "removed"), duration_ms=1500)),
+                ("task", "act:edge", Result("act:edge", True, None))]:
+        app.on_worker_event(*msg)
+    assert all(label.text is None for label in app.labels.values())
+    assert app.apply_list.rows == ["✔ Microsoft Edge — not present", "✔ WebXP — 1.5s"]
+
+def test_detection_results_still_update_labels():
+    app = FakeApp()
+    app.on_worker_event("done", "detect:edge", False)
+    app.on_worker_event("done", "detect:unknown", True)  # no label for it: ignored
+    assert app.labels["edge"].text == "Edge: ✔️ Not installed"
@@ -0,0 +1,63 @@
+import unicodedata
+import bloatguard_inventory
+from bloatguard_inventory import Package, parse_winget_list, _parse_winget, ELLIPSIS
+from bloatguard_catalog import load_catalog
+
+COLS = (20, 20, 12, 12)  # Name, Id, Version, Available; Source last
+
+def cells(s):
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in s)
+
+def row(*values, widths=COLS):
+    return "".join(v + " " * (w - cells(v)) for v, w in zip(values, widths)) + "".join(values[len(widths):])
+
+HEADER = row("Name", "Id", "Version", "Available", "Source")
+RULE = "-" * len(HEADER)
+
+def rows(text):
+    return [(p.name, p.id, p.version, p.source) for p in _parse_winget(text)]
+
+def test_spinner_and_redraws_before_the_header():
+    spinner = "".join(f"\r   {c} " for c in "-\\|/") + "\r  ██▒▒  1 MB / 2 MB\r\x1b[2K\r"
+    text = "\n".join([spinner + HEADER, RULE, row("Microsoft Edge", "Microsoft.Edge", "131.0", "", "winget")])
+    assert rows(text) == [("Microsoft Edge", "Microsoft.Edge", "131.0", "winget")]
+
+def test_empty_available_and_missing_source():
+    text = "\n".join([HEADER, RULE,
+                      row("Vendor Tool", "Vendor.Tool", "1.0", "1.1", "winget"),
+                      row("Local App", "ARP\\Machine\\X", "2.0", "", "").rstrip()])
+    assert rows(text) == [("Vendor Tool", "Vendor.Tool", "1.0", "winget"), ("Local App", "ARP\\Machine\\X", "2.0", "")]
+
+def test_wide_characters_are_cut_by_display_width():
+    text = "\n".join([HEADER, RULE, row("微软 工具 ab", "Vendor.Cjk", "3.0", "", "winget"),
+                      row("Café Zürich", "Vendor.Cafe", "1.0", "", "winget")])
+    assert rows(text) == [("微软 工具 ab", "Vendor.Cjk", "3.0", "winget"), ("Café Zürich", "Vendor.Cafe", "1.0", "winget")]
+
+def test_footer_and_second_table():
+    header2 = row("Name", "Id", "Version", widths=(24, 24)) + "   Source"
+    text = "\n".join([HEADER, RULE, row("Vendor Tool", "Vendor.Tool", "1.0", "1.1", "winget"), "1 upgrades available.", "",
+                      header2, "-" * len(header2), row("Pinned App", "Vendor.Pinned", "4.2", widths=(24, 24))])
+    assert rows(text) == [("Vendor Tool", "Vendor.Tool", "1.0", "winget"), ("Pinned App", "Vendor.Pinned", "4.2", "")]
+
+def test_truncated_id_maps_back_to_the_full_catalogue_id(tmp_path):
+    text = "\n".join([HEADER, RULE, row("Microsoft 365 Apps" + ELLIPSIS, "Microsoft.Offi" + ELLIPSIS, "16.0", "", "winget"),
+                      row("Other", "Microsoft.Ed" + ELLIPSIS, "1.0", "", "winget")])
+    pkgs = parse_winget_list(text)
+    assert all(p.truncated for p in pkgs)
+    hits = load_catalog(tmp_path).compiled().match_winget(pkgs)
+    assert [p.id for p in hits["office"]] == ["Microsoft.Office"] and [p.id for p in hits["edge"]] == ["Microsoft.Edge"]
+
+def test_ambiguous_truncated_id_is_left_alone(tmp_path):
+    text = "\n".join([HEADER, RULE, row("Something", "Microsoft." + ELLIPSIS, "1.0", "", "winget")])
+    assert load_catalog(tmp_path).compiled().match_winget(parse_winget_list(text)) == {}
+
+def test_memo_returns_shared_rows_and_evicts_the_oldest(monkeypatch):
+    monkeypatch.setattr(bloatguard_inventory, "_parsed", {})
+    texts = ["\n".join([HEADER, RULE, row(f"Tool {i}", f"Vendor.T{i}", "1.0", "", "winget")])
+             for i in range(bloatguard_inventory.PARSE_MEMO + 1)]
+    first = parse_winget_list(texts[0])
+    assert parse_winget_list(texts[0]) is first and first[0] == first[0] and isinstance(first[0], Package)
+    for t in texts[1:]:
+        parse_winget_list(t)
+    assert len(bloatguard_inventory._parsed) == bloatguard_inventory.PARSE_MEMO
+    assert parse_winget_list(texts[0]) is not first  # evicted, parsed again
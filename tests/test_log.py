@@ -0,0 +1,15 @@
+import json, threading
+from bloatguard_log import LogPipeline
+
+def test_bad_records_do_not_stop_the_writer(tmp_path):
+    log = LogPipeline(tmp_path / "bg.log")
+    log.write("before", item="edge")
+    log.write("odd fields", seen={"a"}, path=tmp_path)  # not JSON types: written via str()
+    log.write(42)  # make_record can't format it: dropped alone
+    log.write("after", rc=0)
+    t = threading.Thread(target=log.flush, daemon=True); t.start(); t.join(5)
+    assert not t.is_alive(), "flush() hung"
+    log.close()
+    records = [json.loads(line) for line in (tmp_path / "bg.log").read_text(encoding="utf-8").splitlines()]
+    assert [r["msg"] for r in records] == ["before", "odd fields", "after"]
+    assert records[1]["seen"] == "{'a'}" and log.dropped == 1
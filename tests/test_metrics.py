@@ -0,0 +1,8 @@
+from bloatguard_metrics import Metrics
+
+def test_bucket_bounds_render_as_plain_numbers():
+    m = Metrics(enabled=True)
+    m.record("winget", 0.2, 0, 2_000_000, spawned=True)
+    text = m.render()
+    assert 'le="1048576"' in text and 'le="0.25"' in text and "e+" not in text
+    assert 'bloatguard_spawns_total{exe="winget"} 1' in text
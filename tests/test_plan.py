@@ -0,0 +1,74 @@
+import pytest
+import bloatguard_core as core
+import bloatguard_plan
+from bloatguard_plan import History, build_plan, plan_item
+from bloatguard_inventory import Inventory
+from bloatguard_registry import FakeRegistry
+from bloatguard_state import StateCache, Fingerprinter
+from bloatguard_sched import Result
+
+WINGET_LIST = ("Name            Id              Version  Source\n"
+               "------------------------------------------------\n"
+               "Microsoft Edge  Microsoft.Edge  131.0    winget\n")
+APPX_JSON = '[{"Name": "Microsoft.WindowsStore", "PackageFullName": "Microsoft.WindowsStore_1_x64__8w"}]'
+
+@pytest.fixture
+def machine(monkeypatch, tmp_path):
+    def run(cmd, shell=False, timeout=None, until=None):
+        return (0, "v1.9", "") if cmd[:2] == ["winget", "--version"] else (0, WINGET_LIST, "")
+    monkeypatch.setattr(core, "_spawn", run)
+    monkeypatch.setattr(core, "_ps_round_trip", lambda cmds, timeout=None: [(0, APPX_JSON, "")] * len(cmds))
+    monkeypatch.setattr(core, "_registry", [FakeRegistry()])
+    monkeypatch.setattr(core, "STATE_PATH", tmp_path / "state.json")
+    monkeypatch.setattr(core, "inventory", Inventory(lambda cmd, **kw: core.run(cmd, **kw), lambda c: core.run_ps(c)))
+
+FP = Fingerprinter(mtime=lambda p: 1, reg_key_time=lambda k: 1, reg_value=lambda k, n: 1)
+CFG = {"edge": True, "store": True, "office": True, "copilot_disable": True}
+
+def test_plan_lists_only_work_with_default_estimates(machine):
+    plan = build_plan(CFG, history=History(), fingerprinter=FP, state=StateCache(core.STATE_PATH))
+    assert plan.keys() == ["edge", "store", "copilot_disable"]
+    assert plan.skipped == {"office": "not installed"} and plan.blocked == {}
+    edge, store, copilot = plan.steps
+    assert edge.commands[0].startswith("winget uninstall --id Microsoft.Edge --exact")
+    assert store.commands == ["Remove-AppxPackage -Package Microsoft.WindowsStore_1_x64__8w"]
+    assert copilot.commands[-1] == bloatguard_plan.EXPLORER_CMD
+    assert edge.basis == "default" and edge.est_ms == bloatguard_plan.DEFAULT_MS["winget"]
+    assert copilot.est_ms == bloatguard_plan.DEFAULT_MS["policy"] + bloatguard_plan.EXPLORER_RESTART_MS
+
+def test_policy_already_set_needs_nothing(machine):
+    for e in core.catalog()["copilot_disable"].registry:
+        core.registry().set(e["path"], e["name"], e["value"])
+    assert plan_item(core.catalog()["copilot_disable"], History()) == "already set"
+
+def test_history_shares_batch_time_between_the_items_that_acted():
+    records = [{"phase": "start"},
+               {"phase": "remove", "item": "winget", "duration_ms": 900.0},
+               {"phase": "act", "item": "edge", "duration_ms": 10.0},
+               {"phase": "act", "item": "office", "duration_ms": 20.0},
+               {"phase": "start"},
+               {"phase": "act", "item": "edge", "duration_ms": 30.0}]
+    h = History(records, {"edge": "winget", "office": "winget"})
+    assert h.samples == {"edge": [460.0, 30.0], "office": [470.0]}
+    assert h.estimate("edge", "winget") == (245.0, "median of 2 runs")
+    assert h.estimate("store", "appx", units=3) == (3 * bloatguard_plan.DEFAULT_MS["appx"], "default")
+
+def test_logged_apply_results_feed_the_history(machine, tmp_path):
+    log = tmp_path / "bg.log"
+    from bloatguard_log import LogPipeline
+    pipeline = LogPipeline(log)
+    saved = core._log
+    core._log = pipeline
+    try:
+        items = [it for it in core.enforce_items() if it[0] == "edge"]
+        core.log_run_start("apply")
+        core.log_results({"detect:edge": Result("detect:edge", True, True),
+                          "remove:winget": Result("remove:winget", True, {}, duration_ms=800.0),
+                          "act:edge": Result("act:edge", True, (True, "removed"), duration_ms=5.0)}, items)
+        core.log_run_end("apply")
+        pipeline.flush()
+    finally:
+        core._log = saved
+        pipeline.close()
+    h = History.from_log(log)
+    assert h.estimate("edge", "winget") == (805.0, "median of 1 run")
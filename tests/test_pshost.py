@@ -0,0 +1,70 @@
+import sys
+from bloatguard_pshost import PSHost, standin_argv
+
+PY = f'"{sys.executable}" -c'
+
+def test_batch_framing_and_exit_codes():
+    host = PSHost(standin_argv(), timeout=30)
+    try:
+        res = host.run_batch([f"{PY} \"print('a')\"", f"{PY} \"import sys; print('e', file=sys.stderr); sys.exit(3)\""])
+        assert res == [(0, "a", ""), (3, "", "e")]
+        assert host.run(f"{PY} \"print('##BGPS noise'); print('b')\"") == (0, "##BGPS noise\nb", "")
+        assert host.restarts == 0
+    finally:
+        host.close()
+
+def test_timeout_kills_and_restarts():
+    host = PSHost(standin_argv(), timeout=30)
+    try:
+        rc, _, err = host.run(f"{PY} \"import time; time.sleep(30)\"", timeout=0.5)
+        assert rc == 1 and "timed out" in err
+        assert not host.alive()
+        assert host.run(f"{PY} \"print('again')\"") == (0, "again", "")
+        assert host.restarts == 1
+    finally:
+        host.close()
+
+def test_host_exit_is_reported_then_restarted():
+    host = PSHost(standin_argv(), timeout=30)
+    try:
+        host.run(f"{PY} \"print(1)\"")
+        host._proc.kill(); host._proc.wait()
+        assert host.run(f"{PY} \"print(2)\"") == (0, "2", "")
+        assert host.restarts == 1
+    finally:
+        host.close()
+
+def test_unstartable_host():
+    host = PSHost(["/nonexistent/powershell"], timeout=5)
+    rc, _, err = host.run("anything")
+    assert rc == 1 and err
+
+def test_on_spawn_counts_starts_and_restarts():
+    spawns = []
+    host = PSHost(standin_argv(), timeout=30, on_spawn=lambda: spawns.append(1))
+    try:
+        host.run(f"{PY} \"print(1)\"")
+        host.run(f"{PY} \"import time; time.sleep(30)\"", timeout=0.5)
+        host.run(f"{PY} \"print(2)\"")
+        assert len(spawns) == 2 and host.restarts == 1
+    finally:
+        host.close()
+
+def test_timeout_kills_the_commands_children_too(tmp_path):
+    import os, time, pytest
+    if os.name == "nt": pytest.skip("process groups are POSIX")
+    pid_file = tmp_path / "pid"
+    host = PSHost(standin_argv(), timeout=30)
+    try:
+        script = f"import os, time; open(r'{pid_file}', 'w').write(str(os.getpid())); time.sleep(60)"
+        rc, _, err = host.run(f"{PY} \"{script}\"", timeout=1)
+        assert rc == 1 and "timed out" in err
+        pid = int(pid_file.read_text())
+        for _ in range(50):
+            try: os.kill(pid, 0)
+            except ProcessLookupError: break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("command process survived the host kill")
+    finally:
+        host.close()
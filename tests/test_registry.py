@@ -0,0 +1,34 @@
+import pytest
+from bloatguard_registry import FakeRegistry, apply_policy, diff
+
+ADV = r"HKCU\Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced"
+POL = r"HKLM\SOFTWARE\Policies\Microsoft\Windows\WindowsCopilot"
+ENTRIES = [{"path": POL, "name": "TurnOffWindowsCopilot", "value": 1},
+           {"path": ADV, "name": "ShowCopilotButton", "value": 0}]
+
+def test_only_differing_values_are_written():
+    reg = FakeRegistry({(POL, "TurnOffWindowsCopilot"): 1, (ADV, "ShowCopilotButton"): 1})
+    assert [e["name"] for e, _ in diff(reg, ENTRIES)] == ["ShowCopilotButton"]
+    assert [e["name"] for e in apply_policy(reg, ENTRIES)] == ["ShowCopilotButton"]
+    assert reg.writes == 1
+    assert apply_policy(reg, ENTRIES) == [] and reg.writes == 1
+
+def test_failed_write_rolls_back():
+    reg = FakeRegistry({(ADV, "ShowCopilotButton"): 1}, fail_on=["ShowCopilotButton"])
+    with pytest.raises(PermissionError):
+        apply_policy(reg, ENTRIES)
+    assert reg.get(POL, "TurnOffWindowsCopilot") is None  # created, then deleted again
+    assert reg.get(ADV, "ShowCopilotButton") == 1
+
+def test_rollback_restores_previous_value():
+    entries = [{"path": POL, "name": "A", "value": 1}, {"path": POL, "name": "B", "value": 1}]
+    reg = FakeRegistry({(POL, "A"): 0}, fail_on=["B"])
+    with pytest.raises(PermissionError):
+        apply_policy(reg, entries)
+    assert reg.get(POL, "A") == 0
+
+def test_keys_are_case_insensitive_and_hives_checked():
+    reg = FakeRegistry({(POL, "X"): 5})
+    assert reg.get(POL.lower().replace("hklm", "HKLM"), "x") == 5
+    with pytest.raises(ValueError):
+        reg.get(r"HKU\S-1-5-18\Software", "X")
@@ -0,0 +1,53 @@
+import time, threading
+import pytest
+from bloatguard_sched import Task, Scheduler
+
+def test_deps_pass_values_in_order():
+    res = Scheduler().run([Task("a", lambda: 2), Task("b", lambda: 3), Task("sum", lambda a, b: a + b, deps=("a", "b"))])
+    assert list(res) == ["a", "b", "sum"] and res["sum"].value == 5
+
+def test_failed_dep_skips_dependents():
+    def boom(): raise RuntimeError("x")
+    res = Scheduler().run([Task("a", boom), Task("b", lambda a: a, deps=("a",)), Task("c", lambda: 1)])
+    assert not res["a"].ok and "RuntimeError: x" in res["a"].error
+    assert res["b"].skipped and res["b"].error == "dependency failed: a"
+    assert res["c"].ok
+
+def test_locks_serialise_and_free_tasks_overlap():
+    active, peak, lock = [0], [0], threading.Lock()
+    def work():
+        with lock: active[0] += 1; peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock: active[0] -= 1
+    Scheduler().run([Task(f"w{i}", work, locks=("winget",)) for i in range(3)])
+    assert peak[0] == 1
+    peak[0] = 0
+    Scheduler().run([Task(f"f{i}", work) for i in range(3)])
+    assert peak[0] > 1
+
+def test_after_orders_without_values():
+    order = []
+    res = Scheduler().run([Task("late", lambda: order.append("late"), after=("early",)),
+                           Task("early", lambda: (time.sleep(0.02), order.append("early")))])
+    assert order == ["early", "late"] and res["late"].ok
+
+def test_bad_graphs_rejected():
+    with pytest.raises(ValueError):
+        Scheduler().run([Task("a", int, deps=("b",)), Task("b", int, deps=("a",))])
+    with pytest.raises(ValueError):
+        Scheduler().run([Task("a", int, deps=("missing",))])
+    with pytest.raises(ValueError):
+        Scheduler().run([Task("a", int), Task("a", int)])
+
+def test_cancel_skips_pending():
+    cancel = threading.Event()
+    res = Scheduler(max_workers=1).run([Task("a", cancel.set), Task("b", int, after=("a",))], cancel=cancel)
+    assert res["a"].ok and res["b"].skipped and res["b"].error == "cancelled"
+
+def test_failed_after_task_still_orders_but_does_not_skip():
+    def boom(): raise RuntimeError("detect failed")
+    res = Scheduler().run([Task("detect:store", boom), Task("detect:edge", lambda: True),
+                           Task("act:edge", lambda p: p, deps=("detect:edge",), after=("detect:store", "detect:edge")),
+                           Task("act:store", lambda p: p, deps=("detect:store",), after=("detect:store", "detect:edge"))])
+    assert res["act:edge"].ok and res["act:edge"].value is True
+    assert res["act:store"].skipped and res["act:store"].error == "dependency failed: detect:store"
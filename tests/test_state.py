@@ -0,0 +1,38 @@
+from bloatguard_state import StateCache, Fingerprinter, split_unchanged, record_results
+
+class Clock:
+    def __init__(self, t=1000.0): self.t = t
+    def __call__(self): return self.t
+
+def fingerprinter(values):
+    return Fingerprinter(mtime=lambda p: values.get(p), reg_key_time=lambda k: None, reg_value=lambda k, n: None,
+                         sources={"edge": [("path", "edge")], "store": [("path", "store")], "nosrc": []})
+
+def test_unchanged_items_are_skipped_until_fingerprint_changes(tmp_path):
+    values, clock = {"edge": 1, "store": 1}, Clock()
+    fp, cache = fingerprinter(values), StateCache(tmp_path / "s.json", clock=clock)
+    assert split_unchanged(["edge", "store"], cache, fp) == (["edge", "store"], [])
+    record_results(cache, fp, {"edge": (True, 10.0), "store": (False, 5.0)})
+    assert split_unchanged(["edge", "store"], cache, fp) == (["store"], ["edge"])  # failures always re-run
+    values["edge"] = 2
+    assert split_unchanged(["edge"], cache, fp) == (["edge"], [])
+    assert split_unchanged(["edge", "store"], cache, fp, force=True) == (["edge", "store"], [])
+
+def test_items_without_sources_always_run(tmp_path):
+    fp, cache = fingerprinter({}), StateCache(tmp_path / "s.json")
+    record_results(cache, fp, {"nosrc": (True, 1.0)})
+    assert split_unchanged(["nosrc"], cache, fp) == (["nosrc"], [])
+
+def test_ttl_and_persistence(tmp_path):
+    clock, fp = Clock(), fingerprinter({"edge": 1})
+    cache = StateCache(tmp_path / "s.json", ttl=60, clock=clock)
+    record_results(cache, fp, {"edge": (True, 3.0)}); cache.save()
+    reloaded = StateCache(tmp_path / "s.json", ttl=60, clock=clock)
+    assert reloaded.items["edge"]["duration_ms"] == 3.0 and reloaded.fresh("edge", fp.fingerprint("edge"))
+    clock.t += 61
+    assert not reloaded.fresh("edge", fp.fingerprint("edge"))
+    assert StateCache(tmp_path / "s.json", ttl=60, clock=clock).items == {}
+
+def test_corrupt_state_file_is_ignored(tmp_path):
+    (tmp_path / "s.json").write_text("{not json", encoding="utf-8")
+    assert StateCache(tmp_path / "s.json").items == {}
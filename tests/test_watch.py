@@ -0,0 +1,63 @@
+import os, asyncio
+from bloatguard_watch import Watcher, FakeEventSource
+
+def run_watcher(script, routes, debounce=0.05):
+    fired = []
+    async def on_change(keys): fired.append((asyncio.get_running_loop().time(), keys))
+    async def main():
+        src = FakeEventSource()
+        w = Watcher(src, routes, on_change, debounce=debounce)
+        task = asyncio.create_task(w.run())
+        await asyncio.sleep(0)
+        await script(src)
+        w.stop(); await task
+        return w
+    return asyncio.run(main()), fired
+
+def test_burst_fires_once_with_union_of_keys(tmp_path):
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+    async def script(src):
+        for p in (a, os.path.join(b, "x.dll"), a):
+            src.emit(p); await asyncio.sleep(0.01)
+        await asyncio.sleep(0.15)
+    w, fired = run_watcher(script, {a: ["edge"], b: ["store", "office"]})
+    assert [k for _, k in fired] == [{"edge", "store", "office"}]
+    assert w.stats.wakeups >= 4
+
+def test_unrouted_paths_are_ignored(tmp_path):
+    async def script(src):
+        src.emit(str(tmp_path / "elsewhere")); await asyncio.sleep(0.1)
+    _, fired = run_watcher(script, {str(tmp_path / "a"): ["edge"]})
+    assert fired == []
+
+def test_directory_events_match_watched_files(tmp_path):
+    w = Watcher(FakeEventSource(), {str(tmp_path / "cfg" / "bloatguard.config.json"): ["config"]}, None)
+    assert w.keys_for(str(tmp_path / "cfg")) == {"config"}
+
+def test_steady_trickle_fires_by_max_wait(tmp_path):
+    a = str(tmp_path / "a")
+    async def main():
+        fired = []
+        async def on_change(keys): fired.append(keys)
+        src = FakeEventSource()
+        w = Watcher(src, {a: ["config"]}, on_change, debounce=0.1, max_wait=0.3)
+        task = asyncio.create_task(w.run())
+        await asyncio.sleep(0)
+        for _ in range(40):  # an event every 20 ms for 0.8 s never leaves 0.1 s quiet
+            src.emit(a); await asyncio.sleep(0.02)
+        w.stop(); await task
+        return fired
+    fired = asyncio.run(main())
+    assert 2 <= len(fired) <= 3 and all(k == {"config"} for k in fired)
+
+def test_suspended_events_are_dropped_until_the_grace_period_ends(tmp_path):
+    a = str(tmp_path / "a")
+    async def script(src):
+        w = src._notify.__self__
+        w.suspend()
+        src.emit(a); await asyncio.sleep(0.01)
+        w.resume(grace=0.05)
+        src.emit(a); await asyncio.sleep(0.1)  # still within the grace period, then past it
+        src.emit(a); await asyncio.sleep(0.15)
+    w, fired = run_watcher(script, {a: ["edge"]})
+    assert [k for _, k in fired] == [{"edge"}] and w.dropped == 2
@@ -0,0 +1,54 @@
+from bloatguard_worker import LoopMonitor
+
+def test_loop_monitor_keeps_a_bounded_window_and_the_worst_lag():
+    now = [0.0]
+    mon = LoopMonitor(interval_ms=10, clock=lambda: now[0], window=100)
+    for i in range(1000):
+        now[0] += 0.010 + (0.5 if i == 3 else 0.0)  # one 500 ms stall early on
+        mon.tick()
+    assert len(mon.lags_ms) == 100 and mon.ticks == 999
+    s = mon.summary()
+    assert s["max_lag_ms"] == 500.0 and s["p95_lag_ms"] < 1 and s["ticks"] == 999
+    assert not mon.within(16)
+
+import time
+from bloatguard_worker import Worker
+from bloatguard_sched import Task
+
+def wait_for(worker, n, timeout=5):
+    got, deadline = [], time.monotonic() + timeout
+    while len(got) < n and time.monotonic() < deadline:
+        worker.drain(lambda *m: got.append(m), budget_ms=50); time.sleep(0.005)
+    return got
+
+def test_submit_posts_done_or_error():
+    w = Worker()
+    try:
+        w.submit("ok", lambda x: x * 2, 21); w.submit("bad", lambda: 1 / 0)
+        got = sorted(wait_for(w, 2))
+        assert got == [("done", "ok", 42), ("error", "bad", "ZeroDivisionError: division by zero")]
+    finally:
+        w.shutdown()
+
+def test_drain_stops_at_its_budget():
+    w = Worker()
+    try:
+        for i in range(5): w.events.put(("done", f"k{i}", i))
+        slow = lambda *m: time.sleep(0.02)
+        n = w.drain(slow, budget_ms=30)  # stops after the message that crosses the budget
+        assert 1 <= n <= 2 and w.drain(lambda *m: None) == 5 - n
+    finally:
+        w.shutdown()
+
+def test_run_tasks_streams_progress_and_honours_cancel():
+    w = Worker()
+    try:
+        w.run_tasks("apply", [Task("detect:edge", w.cancel), Task("act:edge", int, after=("detect:edge",))])
+        got = wait_for(w, 4)
+        kinds = [(k, n) for k, n, _ in got]
+        assert sorted(kinds[:3]) == [("start", "detect:edge"), ("task", "act:edge"), ("task", "detect:edge")]
+        assert kinds[-1] == ("done", "apply")  # graph progress never uses submit()'s kinds
+        results = got[-1][2]
+        assert results["detect:edge"].ok and results["act:edge"].skipped and results["act:edge"].error == "cancelled"
+    finally:
+        w.shutdown()